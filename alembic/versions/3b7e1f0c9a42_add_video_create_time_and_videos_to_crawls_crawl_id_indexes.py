@@ -0,0 +1,37 @@
+"""add indexes on video.create_time and videos_to_crawls.crawl_id
+
+Revision ID: 3b7e1f0c9a42
+Revises: c45e90da1788
+Create Date: 2026-10-16 10:12:31.482113
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = "3b7e1f0c9a42"
+down_revision: Union[str, None] = "c45e90da1788"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_index(
+        "video_create_time_idx", "video", ["create_time"], unique=False
+    )
+    op.create_index(
+        "videos_to_crawls_crawl_id_idx",
+        "videos_to_crawls",
+        ["crawl_id"],
+        unique=False,
+    )
+
+
+def downgrade() -> None:
+    op.drop_index(
+        "videos_to_crawls_crawl_id_idx", table_name="videos_to_crawls"
+    )
+    op.drop_index("video_create_time_idx", table_name="video")
@@ -1,10 +1,15 @@
 from __future__ import annotations
 
+import contextlib
 import enum
 import json
 import logging
+import os
 import re
+import threading
+import uuid
 from collections.abc import Mapping, Sequence
+from concurrent.futures import Future, ThreadPoolExecutor
 from datetime import date, datetime, timedelta
 from pathlib import Path
 from typing import Any
@@ -26,6 +31,8 @@ from tiktok_research_api_helper.models import (
 )
 from tiktok_research_api_helper.query import VideoQuery, VideoQueryJSONEncoder
 
+_log = logging.getLogger(__name__)
+
 ALL_VIDEO_DATA_URL = "https://open.tiktokapis.com/v2/research/video/query/?fields=id,video_description,create_time,region_code,share_count,view_count,like_count,comment_count,music_id,hashtag_names,username,effect_ids,voice_to_text,playlist_id"
 ALL_USER_INFO_DATA_URL = "https://open.tiktokapis.com/v2/research/user/info/?fields=display_name,bio_description,avatar_url,is_verified,follower_count,following_count,likes_count,video_count"
 ALL_COMMENT_DATA_URL = "https://open.tiktokapis.com/v2/research/video/comment/list/?fields=id,like_count,create_time,text,video_id,parent_comment_id"
@@ -40,8 +47,15 @@ CONSECUTIVE_REQUEST_ERROR_RETRY_LIMIT_DEFAULT = 5
 CONSECUTIVE_REQUEST_ERROR_RETRY_MAX_WAIT = timedelta(minutes=2).total_seconds()
 ACCESS_TOKEN_FETCH_ERROR_RETRY_LIMIT = 10
 ACCESS_TOKEN_FETCH_ERROR_RETRY_MAX_WAIT = timedelta(minutes=10).total_seconds()
+API_RATE_LIMIT_FOUR_HOURS_WAIT = timedelta(hours=4).total_seconds()
 
 DAILY_API_REQUEST_QUOTA = 1000
+# Max raw responses held in memory waiting to be written to disk. Once reached, storing another
+# response waits for a pending write to complete.
+MAX_PENDING_RAW_RESPONSE_WRITES = 16
+
+# Prefer the libyaml backed loader when PyYAML was built with it.
+_YAML_LOADER = getattr(yaml, "CSafeLoader", yaml.SafeLoader)
 
 
 class ApiRateLimitError(Exception):
@@ -164,18 +178,53 @@ def video_query_to_json(video_query: VideoQuery) -> str:
     return video_query
 
 
+def _update_tiktok_date_str_on_setattr(date_str_attribute_name: str):
+    """Returns an on_setattr hook that keeps date_str_attribute_name in sync with the date being
+    set."""
+
+    def hook(instance, attribute, value):
+        setattr(instance, date_str_attribute_name, utils.date_to_tiktok_str_format(value))
+        return value
+
+    return hook
+
+
 @attrs.define
 class VideoQueryConfig:
     query: str = attrs.field(
         converter=video_query_to_json, validator=attrs.validators.instance_of(str)
     )
-    start_date: datetime = attrs.field(validator=attrs.validators.instance_of((date, datetime)))
-    end_date: datetime = attrs.field(validator=attrs.validators.instance_of((date, datetime)))
+    start_date: datetime = attrs.field(
+        validator=attrs.validators.instance_of((date, datetime)),
+        on_setattr=[attrs.setters.validate, _update_tiktok_date_str_on_setattr("start_date_str")],
+    )
+    end_date: datetime = attrs.field(
+        validator=attrs.validators.instance_of((date, datetime)),
+        on_setattr=[attrs.setters.validate, _update_tiktok_date_str_on_setattr("end_date_str")],
+    )
     # WARNING: Fetching comments can greatly increase API quota usage. use with care.
     fetch_comments: bool = False
     fetch_user_info: bool = False
     max_count: int = 100
     crawl_tags: list[str] | None = None
+    # start_date and end_date in the format the API expects. Computed once since a request is
+    # made from this config for every page of results.
+    start_date_str: str = attrs.field(
+        init=False,
+        eq=False,
+        repr=False,
+        default=attrs.Factory(
+            lambda self: utils.date_to_tiktok_str_format(self.start_date), takes_self=True
+        ),
+    )
+    end_date_str: str = attrs.field(
+        init=False,
+        eq=False,
+        repr=False,
+        default=attrs.Factory(
+            lambda self: utils.date_to_tiktok_str_format(self.end_date), takes_self=True
+        ),
+    )
 
 
 @attrs.define
@@ -233,8 +282,8 @@ class TikTokVideoRequest:
         return cls(
             query=config.query,
             max_count=config.max_count,
-            start_date=utils.date_to_tiktok_str_format(config.start_date),
-            end_date=utils.date_to_tiktok_str_format(config.end_date),
+            start_date=config.start_date_str,
+            end_date=config.end_date_str,
             **kwargs,
         )
 
@@ -346,7 +395,7 @@ def api_rate_limi_wait_until_next_utc_midnight(retry_state):
     # If JSON decoding fails retry immediately
     if isinstance(exception, ApiRateLimitError):
         next_utc_midnight = pendulum.tomorrow("UTC")
-        logging.warning(
+        _log.warning(
             "Response indicates rate limit exceeded: %r\n"
             "Sleeping until next UTC midnight: %s (local time %s). Will resume in approx %s",
             exception,
@@ -364,15 +413,46 @@ def api_rate_limi_wait_four_hours(
 ):
     exception = retry_state.outcome.exception()
     if isinstance(exception, ApiRateLimitError):
-        logging.warning(
+        _log.warning(
             "Response indicates rate limit exceeded: %r\nSleeping four hours before trying again.",
             exception,
         )
-        return timedelta(hours=4).seconds
+        return API_RATE_LIMIT_FOUR_HOURS_WAIT
 
     return 0
 
 
+@attrs.define
+class ApiRequestCounter:
+    """Thread safe count of API requests sent. Can be shared by request clients used in parallel
+    threads, so that a max API requests limit applies to their combined requests."""
+
+    _count: int = attrs.field(default=0, validator=attrs.validators.instance_of(int), alias="count")
+    _lock: threading.Lock = attrs.field(factory=threading.Lock, init=False, eq=False, repr=False)
+
+    @property
+    def count(self) -> int:
+        return self._count
+
+    def reset(self) -> None:
+        with self._lock:
+            self._count = 0
+
+    def increment_if_below(self, limit: int | None) -> bool:
+        """Increments count (ie reserves a request) unless count has reached limit (None indicates
+        no limit). Returns True if count was incremented."""
+        with self._lock:
+            if limit is not None and self._count >= limit:
+                return False
+            self._count += 1
+            return True
+
+    def decrement(self) -> None:
+        """Releases a request reserved by increment_if_below, eg because it was never sent."""
+        with self._lock:
+            self._count -= 1
+
+
 @attrs.define
 class TikTokApiRequestClient:
     """
@@ -398,8 +478,15 @@ class TikTokApiRequestClient:
         default=ApiRateLimitWaitStrategy.WAIT_FOUR_HOURS,
         validator=attrs.validators.instance_of(ApiRateLimitWaitStrategy),  # type: ignore - Attrs overload
     )
-    _num_api_requests_sent: int = attrs.field(
-        default=0, kw_only=True, validator=attrs.validators.instance_of(int)
+    # Request clients used in parallel threads can share a counter, so that max_api_requests
+    # applies to their combined requests.
+    _request_counter: ApiRequestCounter = attrs.field(
+        default=None,
+        kw_only=True,
+        converter=attrs.converters.default_if_none(factory=ApiRequestCounter),
+        validator=attrs.validators.instance_of(ApiRequestCounter),
+        # Attrs removes underscores from field names but the static type checker doesn't know that
+        alias="request_counter",
     )
     # None indicates no limit (ie retry indefinitely)
     _max_api_rate_limit_retries: int | None = attrs.field(
@@ -413,11 +500,25 @@ class TikTokApiRequestClient:
         validator=attrs.validators.instance_of(int),
         converter=attrs.converters.default_if_none(CONSECUTIVE_REQUEST_ERROR_RETRY_LIMIT_DEFAULT),
     )
+    # Writes raw responses to raw_responses_output_dir off of the request path. Created on first
+    # use. Pending writes are completed before the interpreter exits, or by close().
+    _raw_response_writer: ThreadPoolExecutor | None = attrs.field(default=None, init=False)
+    # Bounds the number of raw responses queued for writing, so that they do not pile up in memory
+    # when writing is slower than the API.
+    _pending_raw_response_writes: threading.BoundedSemaphore = attrs.field(
+        factory=lambda: threading.BoundedSemaphore(MAX_PENDING_RAW_RESPONSE_WRITES),
+        init=False,
+        eq=False,
+        repr=False,
+    )
+    # First error raised by a background raw response write, re-raised by the next request,
+    # _store_response, or close() call.
+    _raw_response_write_error: BaseException | None = attrs.field(default=None, init=False)
 
     @classmethod
     def from_credentials_file(cls, credentials_file: Path, **kwargs) -> TikTokApiRequestClient:
         with credentials_file.open("r") as f:
-            dict_credentials = yaml.load(f, Loader=yaml.FullLoader)
+            dict_credentials = yaml.load(f, Loader=_YAML_LOADER)
 
         return cls(
             **kwargs,
@@ -426,21 +527,34 @@ class TikTokApiRequestClient:
 
     @property
     def num_api_requests_sent(self):
-        return self._num_api_requests_sent
+        return self._request_counter.count
 
     def reset_num_requests(self):
-        self._num_api_requests_sent = 0
+        """Resets the request counter. If the counter is shared with other clients (see
+        request_counter) this resets their count too."""
+        self._request_counter.reset()
 
     def __attrs_post_init__(self):
         self._configure_request_sessions()
 
+    def close(self) -> None:
+        """Waits for pending raw response writes to complete. Raises the error of any raw response
+        write that failed and has not yet been raised.
+
+        The client can continue to be used after this is called.
+        """
+        if self._raw_response_writer is not None:
+            self._raw_response_writer.shutdown(wait=True)
+            self._raw_response_writer = None
+        self._raise_raw_response_write_error()
+
     @tenacity.retry(
         stop=tenacity.stop_after_attempt(ACCESS_TOKEN_FETCH_ERROR_RETRY_LIMIT),
         wait=tenacity.wait_exponential(
             multiplier=2, min=1, max=ACCESS_TOKEN_FETCH_ERROR_RETRY_MAX_WAIT
         ),
         retry=tenacity.retry_if_exception_type(AccessTokenFetchFailure),
-        before_sleep=tenacity.before_sleep_log(logging.getLogger(), logging.INFO),
+        before_sleep=tenacity.before_sleep_log(_log, logging.INFO),
         reraise=True,
     )
     def _get_client_access_token(
@@ -462,12 +576,12 @@ class TikTokApiRequestClient:
             "https://open.tiktokapis.com/v2/oauth/token/", headers=headers, data=data
         )
         if not response.ok:
-            logging.error("Problem with access token response: %s", response)
+            _log.error("Problem with access token response: %s", response)
 
         try:
             access_data = response.json()
         except rq.exceptions.JSONDecodeError as e:
-            logging.info(
+            _log.info(
                 "Access token raw response: %s\n%s\n%s",
                 response.status_code,
                 response.headers,
@@ -475,13 +589,13 @@ class TikTokApiRequestClient:
             )
             raise e
         if "access_token" not in access_data:
-            logging.info("Access token retrieval failed. response: %s", access_data)
+            _log.info("Access token retrieval failed. response: %s", access_data)
             if access_data.get("error") == "invalid_client":
                 raise ApiRejectedCredentialsError(repr(access_data))
             raise AccessTokenFetchFailure(repr(access_data))
 
-        logging.info("Access token retrieval succeeded")
-        logging.debug("Access token response: %s", access_data)
+        _log.info("Access token retrieval succeeded")
+        _log.debug("Access token response: %s", access_data)
 
         return access_data["access_token"]
 
@@ -509,7 +623,7 @@ class TikTokApiRequestClient:
     ) -> rq.Response | None:
         # Adapted from https://stackoverflow.com/questions/37094419/python-requests-retry-request-after-re-authentication
         if r.status_code == 401:
-            logging.info("Fetching new token as the previous token expired")
+            _log.info("Fetching new token as the previous token expired")
 
             token = self._get_client_access_token()
             self._api_request_session.headers.update({"Authorization": f"Bearer {token}"})
@@ -523,14 +637,45 @@ class TikTokApiRequestClient:
     def _store_response(self, response: rq.Response) -> None:
         if self._raw_responses_output_dir is None:
             raise ValueError("No output directory set")
+        self._raise_raw_response_write_error()
 
+        # Random suffix so that clients writing to the same directory (eg parallel queries) never
+        # pick the same file name.
         output_filename = self._raw_responses_output_dir / Path(
-            str(pendulum.now("local").timestamp()) + ".json"
+            f"{pendulum.now('local').timestamp()}_{uuid.uuid4().hex}.json"
         )
         output_filename = output_filename.absolute()
-        logging.info("Writing raw reponse to %s", output_filename)
-        with output_filename.open("x") as f:
-            f.write(response.text)
+        _log.info("Writing raw reponse to %s", output_filename)
+        if self._raw_response_writer is None:
+            self._raw_response_writer = ThreadPoolExecutor(
+                max_workers=1, thread_name_prefix="raw_response_writer"
+            )
+        self._pending_raw_response_writes.acquire()
+        try:
+            future = self._raw_response_writer.submit(
+                _write_raw_response, output_filename, response.content
+            )
+        except BaseException:
+            self._pending_raw_response_writes.release()
+            raise
+        future.add_done_callback(self._raw_response_write_done)
+
+    def _raw_response_write_done(self, future: Future) -> None:
+        self._pending_raw_response_writes.release()
+        error = future.exception()
+        if error is None:
+            return
+        _log.error("Failed to write raw response: %s", error)
+        if self._raw_response_write_error is None:
+            self._raw_response_write_error = error
+
+    def _raise_raw_response_write_error(self) -> None:
+        """Raises (once) the error of a failed background raw response write, so that raw
+        responses are not silently lost (eg disk full)."""
+        error = self._raw_response_write_error
+        if error is not None:
+            self._raw_response_write_error = None
+            raise error
 
     def _fetch_retryer(self) -> tenacity.Retrying:
         """This retryer is for API level issues, ie Rate limit being hit, API bugs (like search ID
@@ -558,7 +703,7 @@ class TikTokApiRequestClient:
                 ),
             ),
             stop=stop_strategy,
-            before_sleep=tenacity.before_sleep_log(logging.getLogger(), logging.DEBUG),
+            before_sleep=tenacity.before_sleep_log(_log, logging.DEBUG),
             reraise=True,
         )
 
@@ -590,7 +735,7 @@ class TikTokApiRequestClient:
     def max_api_requests_reached(self) -> bool:
         if self._max_api_requests is None:
             return False
-        return self._num_api_requests_sent >= self._max_api_requests
+        return self._request_counter.count >= self._max_api_requests
 
     def _post_retryer(self) -> tenacity.Retrying:
         """This retryer is for request level issues, ie 500 errors, timeouts, etc
@@ -603,27 +748,36 @@ class TikTokApiRequestClient:
                 multiplier=2, min=30, max=CONSECUTIVE_REQUEST_ERROR_RETRY_MAX_WAIT
             ),
             retry=tenacity.retry_if_exception_type((rq.RequestException, ApiServerError)),
-            before_sleep=tenacity.before_sleep_log(logging.getLogger(), logging.DEBUG),
+            before_sleep=tenacity.before_sleep_log(_log, logging.DEBUG),
             reraise=True,
         )
 
     def _post(self, request: TikTokVideoRequest, url: str) -> rq.Response | None:
-        return self._post_retryer()(self._actually_post, request, url)
-
-    def _actually_post(self, request: TikTokVideoRequest, url: str) -> rq.Response | None:
-        if self.max_api_requests_reached():
+        self._raise_raw_response_write_error()
+        # Serialize the request body once, rather than on each retry.
+        data = request.as_json()
+        _log.debug("Sending request with data: %s", data)
+        return self._post_retryer()(self._actually_post, data.encode(), url)
+
+    def _actually_post(self, data: bytes, url: str) -> rq.Response | None:
+        # Reserved before sending so that clients sharing a counter cannot together exceed the
+        # limit. Only requests which get a response count, so the reservation is released if
+        # posting fails (eg connection error).
+        if not self._request_counter.increment_if_below(self._max_api_requests):
             msg = (
                 f"Refusing to send API request because it would exceed max requests limit: "
-                f"{self._max_api_requests}.  This client has sent {self._num_api_requests_sent} "
-                f"requests"
+                f"{self._max_api_requests}.  {self._request_counter.count} requests have been sent"
             )
             raise MaxApiRequestsReachedError(msg)
-        data = request.as_json()
-        logging.debug("Sending request with data: %s", data)
 
-        response = self._api_request_session.post(url=url, data=data)
-        logging.debug("%s\n%s", response, response.text)
-        self._num_api_requests_sent += 1
+        try:
+            response = self._api_request_session.post(url=url, data=data)
+        except BaseException:
+            self._request_counter.decrement()
+            raise
+        if _log.isEnabledFor(logging.DEBUG):
+            # response.text decodes the whole body, so only do it when it will be logged.
+            _log.debug("%s\n%s", response, response.text)
 
         if self._raw_responses_output_dir is not None:
             self._store_response(response)
@@ -668,23 +822,37 @@ class TikTokApiRequestClient:
                     )
 
             except json.JSONDecodeError:
-                logging.debug("Unable to JSON decode response data:\n%s", response.text)
+                _log.debug("Unable to JSON decode response data:\n%s", response.text)
 
             raise InvalidRequestError(f"{response!r} {response.text}", response=response)
 
         if response.status_code == 500:
-            logging.info("API responded 500. This happens occasionally")
+            _log.info("API responded 500. This happens occasionally")
             raise ApiServerError(response.text)
 
-        logging.warning(
-            f"Request failed, status code {response.status_code} - text {response.text} - data "
-            "{data}",
+        _log.warning(
+            "Request failed, status code %s - text %s - data %s",
+            response.status_code,
+            response.text,
+            data.decode(),
         )
         response.raise_for_status()
         # In case raise_for_status does not raise an exception we return None
         return None
 
 
+def _write_raw_response(output_filename: Path, content: bytes) -> None:
+    # O_EXCL so that, like open(mode="x"), an existing file is never overwritten.
+    fd = os.open(output_filename, os.O_WRONLY | os.O_CREAT | os.O_EXCL, 0o644)
+    try:
+        # os.write may write fewer bytes than requested, so write until all content is written.
+        remaining = memoryview(content)
+        while remaining:
+            remaining = remaining[os.write(fd, remaining) :]
+    finally:
+        os.close(fd)
+
+
 def _parse_video_response(response: rq.Response) -> TikTokVideoResponse:
     response_json = _extract_response_json_or_raise_error(response)
     error_data = response_json.get("error")
@@ -726,7 +894,7 @@ def _extract_response_json_or_raise_error(response: rq.Response | None) -> Mappi
     try:
         return response.json(cls=NullByteRemovingJSONDencoder)
     except rq.exceptions.JSONDecodeError:
-        logging.info(
+        _log.info(
             "Error parsing JSON response:\n%s\n%s\n%s\n%s",
             response.url,
             response.status_code,
@@ -744,9 +912,8 @@ def update_crawl_from_api_response(
 
     if "search_id" in api_response.data and api_response.data["search_id"] != crawl.search_id:
         if crawl.search_id is not None:
-            logging.log(
-                logging.ERROR,
-                f"search_id changed! Was {crawl.search_id} now {api_response.data['search_id']}",
+            _log.error(
+                "search_id changed! Was %s now %s", crawl.search_id, api_response.data["search_id"]
             )
         crawl.search_id = api_response.data["search_id"]
 
@@ -797,14 +964,28 @@ class TikTokApiClient:
     _comments_cache: Mapping[str, TikTokVideoResponse] = attrs.field(
         default=None, kw_only=True, converter=attrs.converters.default_if_none(factory=dict)
     )
+    # Held while storing results to database. Clients running in parallel threads against a
+    # database that only allows a single writer (ie SQLite) should share a lock here.
+    _store_lock: contextlib.AbstractContextManager = attrs.field(
+        default=None,
+        kw_only=True,
+        converter=attrs.converters.default_if_none(factory=contextlib.nullcontext),
+    )
 
     @classmethod
-    def from_config(cls, config: ApiClientConfig, request_client=None, **kwargs) -> TikTokApiClient:
+    def from_config(
+        cls,
+        config: ApiClientConfig,
+        request_client=None,
+        request_counter: ApiRequestCounter | None = None,
+        **kwargs,
+    ) -> TikTokApiClient:
         return cls(
             **kwargs,
             config=config,
             request_client=TikTokApiRequestClient.from_credentials_file(
                 credentials_file=config.api_credentials_file,
+                request_counter=request_counter,
                 raw_responses_output_dir=config.raw_responses_output_dir,
                 max_api_rate_limit_retries=config.max_api_rate_limit_retries,
                 max_api_requests=config.max_api_requests,
@@ -818,6 +999,7 @@ class TikTokApiClient:
         return self._request_client.num_api_requests_sent
 
     def reset_num_requests(self):
+        """See TikTokApiRequestClient.reset_num_requests"""
         self._request_client.reset_num_requests()
 
     @property
@@ -833,6 +1015,11 @@ class TikTokApiClient:
         self._user_info_cache.clear()
         self._comments_cache.clear()
 
+    def close(self):
+        """Waits for pending raw response writes to complete, raising the error of any that failed.
+        See TikTokApiRequestClient.close"""
+        self._request_client.close()
+
     def api_results_iter(self, query_config: VideoQueryConfig) -> TikTokApiClientFetchResult:
         """Fetches all results from API (ie requests until API indicates query results have been
         fully delivered (has_more == False)). Yielding each API response individually.
@@ -843,9 +1030,9 @@ class TikTokApiClient:
             # Set has_more to True since we have not yet made an API request
             has_more=True,
         )
-        logging.debug("Crawl: %s", crawl)
+        _log.debug("Crawl: %s", crawl)
 
-        logging.info("Beginning API results fetch VideoQueryConfig: %s.", query_config)
+        _log.info("Beginning API results fetch VideoQueryConfig: %s.", query_config)
         while crawl.has_more:
             request = TikTokVideoRequest.from_config(
                 config=query_config,
@@ -860,14 +1047,14 @@ class TikTokApiClient:
                 videos = api_response.videos
 
                 if api_response.data:
-                    logging.debug(
+                    _log.debug(
                         "api_response.data: cursor: %s, has_more: %s, search_id: %s",
                         api_response.data.get("cursor"),
                         api_response.data.get("has_more"),
                         api_response.data.get("search_id"),
                     )
-                    logging.debug("API response error section: %s", api_response.error)
-                    logging.debug("API response videos results:\n%s", api_response.videos)
+                    _log.debug("API response error section: %s", api_response.error)
+                    _log.debug("API response videos results:\n%s", api_response.videos)
 
                 update_crawl_from_api_response(
                     crawl=crawl,
@@ -890,10 +1077,10 @@ class TikTokApiClient:
                             for comment in response.comments
                         ]
             except MaxApiRequestsReachedError as e:
-                logging.info("Stopping api_results_iter due to %r", e)
+                _log.info("Stopping api_results_iter due to %r", e)
                 break
             except (ApiServerError, InvalidSearchIdError, InvalidCountOrCursorError) as e:
-                logging.warning("Crawl failed due to API server error: %s", e)
+                _log.warning("Crawl failed due to API server error: %s", e)
                 if self._config.raise_error_on_persistent_api_server_error:
                     raise e from None
                 break
@@ -909,7 +1096,7 @@ class TikTokApiClient:
                         crawl=crawl,
                     )
 
-        logging.info(
+        _log.info(
             "Crawl completed, reached configured max_api_requests: %s, or stopped due to an error. "
             "Num api requests: %s. Expected remaining API request quota: %s",
             self._config.max_api_requests,
@@ -926,7 +1113,7 @@ class TikTokApiClient:
             if response_is_ok(user_info_response):
                 user_info_responses.append(user_info_response)
             else:
-                logging.warning("Error fetching user info for %s: %s", username, user_info_response)
+                _log.warning("Error fetching user info for %s: %s", username, user_info_response)
         return user_info_responses
 
     def fetch_user_info(self, username: str) -> TikTokUserInfoResponse:
@@ -936,7 +1123,7 @@ class TikTokApiClient:
                     TikTokUserInfoRequest(username)
                 )
             except (InvalidUsernameError, RefusedUsernameError) as e:
-                logging.info("username %s not found. %s", username, e)
+                _log.info("username %s not found. %s", username, e)
                 self._user_info_cache[username] = TikTokUserInfoResponse(
                     username=username, error=e.error_json, user_info=None, data=None
                 )
@@ -966,7 +1153,7 @@ class TikTokApiClient:
                 TikTokCommentsRequest(video_id=video_id, cursor=cursor)
             )
             if not response_is_ok(response):
-                logging.warning("Error fetching comments for video id %s: %s", video_id, response)
+                _log.warning("Error fetching comments for video id %s: %s", video_id, response)
                 break
 
             # Only add response if video has comments
@@ -977,14 +1164,14 @@ class TikTokApiClient:
             cursor = response.data.get("cursor")
 
             if cursor is None:
-                logging.debug(
+                _log.debug(
                     "Stopping comments fetch for video ID %s because cursor is empty.", video_id
                 )
                 has_more = False
                 break
 
             if cursor > MAX_COMMENTS_CURSOR:
-                logging.debug(
+                _log.debug(
                     "Stopping comments fetch for video ID %s because cursor %s excceds "
                     "maximum API allows (%s)",
                     video_id,
@@ -996,7 +1183,11 @@ class TikTokApiClient:
         return comment_responses
 
     def fetch_all(
-        self, query_config: VideoQueryConfig, *args, store_results_after_each_response: bool = False
+        self,
+        query_config: VideoQueryConfig,
+        *args,
+        store_results_after_each_response: bool = False,
+        store_results_in_background: bool = False,
     ) -> TikTokApiClientFetchResult:
         """Fetches all results from API (ie sends requests until API indicates query results have
         been fully delivered (has_more == False))
@@ -1005,6 +1196,12 @@ class TikTokApiClient:
             store_results_after_each_response: bool, if true used database engine from config to
             store api results in database after each response is received (and before requesting
             next page of results).
+            store_results_in_background: bool, if true (and store_results_after_each_response is
+            true) each response (after the first, which creates the crawl's database row) is stored
+            by a background thread while the next page of results is requested. At most one
+            response is pending storage at a time, and it is stored with a snapshot of the crawl's
+            progress as of that response. The database engine must be usable from another thread
+            (ie not an in-memory SQLite database).
         """
         if args:
             raise ValueError("This function does not allow any positional arguments")
@@ -1012,17 +1209,45 @@ class TikTokApiClient:
         user_info = []
         comments = []
         crawl = None
-        for api_response in self.api_results_iter(query_config):
-            video_data.extend(api_response.videos)
-            if api_response.user_info:
-                user_info.extend(api_response.user_info)
-            if api_response.comments:
-                comments.extend(api_response.comments)
-            if store_results_after_each_response and api_response.videos:
-                self.store_fetch_result(fetch_result=api_response)
-            crawl = api_response.crawl
-
-        logging.debug("fetch_all video results:\n%s", video_data)
+        with contextlib.ExitStack() as exit_stack:
+            store_executor = None
+            pending_store: Future | None = None
+            if store_results_after_each_response and store_results_in_background:
+                store_executor = exit_stack.enter_context(ThreadPoolExecutor(max_workers=1))
+
+            try:
+                for api_response in self.api_results_iter(query_config):
+                    video_data.extend(api_response.videos)
+                    if api_response.user_info:
+                        user_info.extend(api_response.user_info)
+                    if api_response.comments:
+                        comments.extend(api_response.comments)
+                    if store_results_after_each_response and api_response.videos:
+                        # The first stored response creates the crawl's row (assigning the crawl
+                        # its id), so it is always stored before fetching continues.
+                        if store_executor is None or api_response.crawl.id is None:
+                            self.store_fetch_result(fetch_result=api_response)
+                        else:
+                            # Wait for the previous response to be stored (and surface any error
+                            # it raised) before handing off this one.
+                            if pending_store is not None:
+                                pending_store.result()
+                            # api_results_iter updates the crawl as it fetches the next page, so
+                            # store a snapshot of the progress this response corresponds to.
+                            pending_store = store_executor.submit(
+                                self.store_fetch_result,
+                                fetch_result=attrs.evolve(
+                                    api_response, crawl=api_response.crawl.progress_snapshot()
+                                ),
+                            )
+                    crawl = api_response.crawl
+            finally:
+                # Also wait if fetching raised, so that an error storing the last response is not
+                # lost (it is chained to the fetch error, if any).
+                if pending_store is not None:
+                    pending_store.result()
+
+        _log.debug("fetch_all video results:\n%s", video_data)
         return TikTokApiClientFetchResult(
             videos=video_data,
             user_info=user_info or None,
@@ -1035,19 +1260,30 @@ class TikTokApiClient:
         fetch_result: TikTokApiClientFetchResult,
     ):
         """Stores API results to database."""
-        logging.debug("Putting crawl to database: %s", fetch_result.crawl)
-        fetch_result.crawl.upload_self_to_db(self._config.engine)
-        logging.debug("Upserting videos")
-        upsert_videos(
-            video_data=fetch_result.videos,
-            crawl_id=fetch_result.crawl.id,
-            crawl_tags=fetch_result.crawl.crawl_tags,
-            engine=self._config.engine,
-        )
-        if fetch_result.user_info:
-            upsert_user_info(user_info_sequence=fetch_result.user_info, engine=self._config.engine)
-        if fetch_result.comments:
-            upsert_comments(comments=fetch_result.comments, engine=self._config.engine)
+        with self._store_lock:
+            _log.debug("Putting crawl to database: %s", fetch_result.crawl)
+            # After the first response only the crawl's progress fields change, so skip re-syncing
+            # crawl tags and the merge's SELECT.
+            fetch_result.crawl.update_progress_in_db(self._config.engine)
+            _log.debug("Upserting videos")
+            upsert_videos(
+                video_data=fetch_result.videos,
+                crawl_id=fetch_result.crawl.id,
+                crawl_tags=fetch_result.crawl.crawl_tags,
+                engine=self._config.engine,
+            )
+            if fetch_result.user_info:
+                upsert_user_info(
+                    user_info_sequence=fetch_result.user_info, engine=self._config.engine
+                )
+            if fetch_result.comments:
+                upsert_comments(comments=fetch_result.comments, engine=self._config.engine)
 
-    def fetch_and_store_all(self, query_config: VideoQueryConfig) -> TikTokApiClientFetchResult:
-        return self.fetch_all(query_config=query_config, store_results_after_each_response=True)
+    def fetch_and_store_all(
+        self, query_config: VideoQueryConfig, store_results_in_background: bool = False
+    ) -> TikTokApiClientFetchResult:
+        return self.fetch_all(
+            query_config=query_config,
+            store_results_after_each_response=True,
+            store_results_in_background=store_results_in_background,
+        )
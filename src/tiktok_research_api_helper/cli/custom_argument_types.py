@@ -276,3 +276,24 @@ MaxDaysPerQueryType = Annotated[
         )
     ),
 ]
+
+MaxParallelQueriesType = Annotated[
+    int,
+    typer.Option(
+        help=(
+            "Maximum number of query date windows (see --max-days-per-query) to fetch in parallel. "
+            "--max-api-requests limits the combined requests of all parallel workers."
+        )
+    ),
+]
+
+StoreResultsInBackgroundFlag = Annotated[
+    bool,
+    typer.Option(
+        help=(
+            "Store each page of API results in the database while the next page is fetched. This "
+            "reduces crawl time, but a page may be fetched (consuming API quota) before failure to "
+            "store the previous page is reported. Ignored for in-memory SQLite databases."
+        )
+    ),
+]
@@ -1,7 +1,9 @@
+import contextlib
 import json
 import logging
+import threading
 from collections.abc import Mapping, Sequence
-from copy import copy
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from datetime import datetime
 from functools import partial
 from pathlib import Path
@@ -11,6 +13,7 @@ import attrs
 import pause
 import pendulum
 import typer
+from sqlalchemy import Engine
 
 from tiktok_research_api_helper import region_codes, utils
 from tiktok_research_api_helper.api_client import (
@@ -18,6 +21,7 @@ from tiktok_research_api_helper.api_client import (
     DAILY_API_REQUEST_QUOTA,
     ApiClientConfig,
     ApiRateLimitWaitStrategy,
+    ApiRequestCounter,
     TikTokApiClient,
     VideoQueryConfig,
 )
@@ -44,10 +48,12 @@ from tiktok_research_api_helper.cli.custom_argument_types import (
     MaxApiRequests,
     MaxConsecutiveRequestErrorRetries,
     MaxDaysPerQueryType,
+    MaxParallelQueriesType,
     OnlyUsernamesListType,
     RawResponsesOutputDir,
     RegionCodeListType,
     StopAfterOneRequestFlag,
+    StoreResultsInBackgroundFlag,
     TikTokEndDateFormat,
     TikTokStartDateFormat,
     VideoIdListType,
@@ -77,24 +83,90 @@ def main_driver(
     api_client_config: ApiClientConfig,
     query_config: VideoQueryConfig,
     max_days_per_query: int,
+    max_parallel_queries: int = 1,
+    store_results_in_background: bool = False,
 ):
     # TODO(macpd): maybe move this logic int TikTokApiClient
     max_days_per_query = utils.int_to_days(max_days_per_query)
 
-    start_date = copy(query_config.start_date)
-
-    api_client = TikTokApiClient.from_config(api_client_config)
+    windows = utils.make_query_date_windows(
+        query_config.start_date, query_config.end_date, max_days_per_query
+    )
 
-    while start_date <= query_config.end_date:
-        local_end_date = start_date + max_days_per_query
-        local_end_date = min(local_end_date, query_config.end_date)
-        local_query_config = attrs.evolve(
-            query_config, start_date=start_date, end_date=local_end_date
+    if store_results_in_background and not _engine_usable_from_other_threads(
+        api_client_config.engine
+    ):
+        logging.warning(
+            "Cannot store results in background for in-memory database, storing in foreground"
         )
+        store_results_in_background = False
+
+    if max_parallel_queries <= 1:
+        api_client = TikTokApiClient.from_config(api_client_config)
+        try:
+            for window in windows:
+                api_client.fetch_and_store_all(
+                    window_query_config(query_config, window),
+                    store_results_in_background=store_results_in_background,
+                )
+        finally:
+            # Flush pending raw response writes even if fetching failed.
+            api_client.close()
+        return
 
-        api_client.fetch_and_store_all(local_query_config)
+    # SQLite only allows a single writer, so serialize database writes across workers.
+    store_lock = None
+    if api_client_config.engine is not None and api_client_config.engine.dialect.name == "sqlite":
+        store_lock = threading.Lock()
 
-        start_date += max_days_per_query
+    # Workers share one request counter, so that max_api_requests limits their combined requests.
+    request_counter = ApiRequestCounter()
+
+    # Each worker thread gets its own client (and therefore its own HTTP sessions).
+    thread_local = threading.local()
+
+    with (
+        # Exited after the executor, so clients are closed (flushing pending raw response writes)
+        # once all workers are done, even if one failed.
+        contextlib.ExitStack() as api_clients_closer,
+        ThreadPoolExecutor(max_workers=max_parallel_queries) as executor,
+    ):
+
+        def fetch_and_store_window(window: utils.CrawlDateWindow) -> None:
+            if not hasattr(thread_local, "api_client"):
+                thread_local.api_client = TikTokApiClient.from_config(
+                    api_client_config, store_lock=store_lock, request_counter=request_counter
+                )
+                api_clients_closer.callback(thread_local.api_client.close)
+            thread_local.api_client.fetch_and_store_all(
+                window_query_config(query_config, window),
+                store_results_in_background=store_results_in_background,
+            )
+
+        futures = [executor.submit(fetch_and_store_window, window) for window in windows]
+        try:
+            # Re-raise the first exception raised in a worker as soon as it happens
+            for future in as_completed(futures):
+                future.result()
+        except BaseException:
+            # Do not start the remaining windows (eg if API rejected credentials). Windows already
+            # being fetched run to completion.
+            executor.shutdown(wait=False, cancel_futures=True)
+            raise
+
+
+def _engine_usable_from_other_threads(engine: Engine | None) -> bool:
+    """In-memory SQLite databases only exist for the connection (and therefore thread) that
+    created them, so they cannot be written to from another thread."""
+    if engine is None:
+        return False
+    return engine.dialect.name != "sqlite" or engine.url.database not in (None, "", ":memory:")
+
+
+def window_query_config(
+    query_config: VideoQueryConfig, window: utils.CrawlDateWindow
+) -> VideoQueryConfig:
+    return attrs.evolve(query_config, start_date=window.start_date, end_date=window.end_date)
 
 
 @APP.command()
@@ -109,7 +181,7 @@ def test(
     The test query is for the hashtag "snoopy" in the US.
     """
     utils.setup_logging_info_level()
-    logging.log(logging.INFO, f"Arguments: {locals()}")
+    logging.info("Arguments: %s", locals())
 
     test_query = VideoQuery(
         and_=[
@@ -118,7 +190,7 @@ def test(
         ]
     )
 
-    logging.log(logging.INFO, f"VideoQuery: {test_query}")
+    logging.info("VideoQuery: %s", test_query)
 
     start_date_datetime = utils.str_tiktok_date_format_to_datetime("20241031")
     end_date_datetime = utils.str_tiktok_date_format_to_datetime("20241031")
@@ -146,11 +218,10 @@ def test(
 
 def get_query_file_json(query_file: Path):
     with query_file.open("r") as f:
-        file_contents = f.read()
-    try:
-        return json.loads(file_contents)
-    except json.JSONDecodeError as e:
-        raise typer.BadParameter(f"Unable to parse {query_file} as JSON: {e}") from None
+        try:
+            return json.load(f)
+        except json.JSONDecodeError as e:
+            raise typer.BadParameter(f"Unable to parse {query_file} as JSON: {e}") from None
 
 
 def validate_mutually_exclusive_flags(
@@ -159,14 +230,15 @@ def validate_mutually_exclusive_flags(
     """Takes a dict of flag names -> flag values, and raises an exception if more than one or none
     specified."""
 
-    num_values_not_none = len(list(filter(lambda x: x is not None, flags_names_to_values.values())))
-    flag_names_str = ", ".join(flags_names_to_values.keys())
+    num_values_not_none = sum(value is not None for value in flags_names_to_values.values())
 
     if num_values_not_none > 1:
-        raise typer.BadParameter(f"{flag_names_str} are mutually exclusive. Please use only one.")
+        raise typer.BadParameter(
+            f"{', '.join(flags_names_to_values)} are mutually exclusive. Please use only one."
+        )
 
     if at_least_one_required and num_values_not_none == 0:
-        raise typer.BadParameter(f"Must specify one of {flag_names_str}")
+        raise typer.BadParameter(f"Must specify one of {', '.join(flags_names_to_values)}")
 
 
 def validate_region_code_flag_value(region_code_list: Sequence[str] | None):
@@ -443,6 +515,8 @@ def run(
         CONSECUTIVE_REQUEST_ERROR_RETRY_LIMIT_DEFAULT
     ),
     max_days_per_query: MaxDaysPerQueryType = _MAX_DAYS_PER_QUERY_DEFAULT,
+    max_parallel_queries: MaxParallelQueriesType = 1,
+    store_results_in_background: StoreResultsInBackgroundFlag = False,
     crawl_tag: CrawlTagType = None,
     raw_responses_output_dir: RawResponsesOutputDir = None,
     query_file_json_list: JsonQueryFileListType = None,
@@ -493,7 +567,10 @@ def run(
             f"{_DAYS_PER_QUERY_MAX_API_ALLOWED}. This is a restriction of the tiktok research API."
         )
 
-    logging.log(logging.INFO, f"Arguments: {locals()}")
+    if max_parallel_queries <= 0:
+        raise typer.BadParameter("--max-parallel-queries must be a positive integer.")
+
+    logging.info("Arguments: %s", locals())
 
     # Using an actual datetime object instead of a string would not allows to
     # specify the CLI help docs in the format %Y%m%d
@@ -625,4 +702,10 @@ def run(
     logging.info("API client config: %s\nVideo query configs: %s", api_client_config, query_configs)
 
     for query_config in query_configs:
-        main_driver(api_client_config, query_config, max_days_per_query=max_days_per_query)
+        main_driver(
+            api_client_config,
+            query_config,
+            max_days_per_query=max_days_per_query,
+            max_parallel_queries=max_parallel_queries,
+            store_results_in_background=store_results_in_background,
+        )
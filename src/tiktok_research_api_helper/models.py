@@ -1,6 +1,4 @@
-import copy
 import datetime
-import itertools
 import json
 from collections.abc import Mapping, Sequence
 from pathlib import Path
@@ -18,11 +16,17 @@ from sqlalchemy import (
     Table,
     UniqueConstraint,
     create_engine,
+    delete,
+    event,
     func,
+    inspect,
+    literal,
+    make_url,
     select,
+    union_all,
+    update,
 )
 from sqlalchemy.dialects import postgresql, sqlite
-from sqlalchemy.ext.mutable import MutableDict
 from sqlalchemy.orm import (
     DeclarativeBase,
     Mapped,
@@ -34,9 +38,18 @@ from sqlalchemy.orm import (
 
 from tiktok_research_api_helper.query import VideoQuery, VideoQueryJSONEncoder
 
-# See https://amercader.net/blog/beware-of-json-fields-in-sqlalchemy/
-MUTABLE_JSON = MutableDict.as_mutable(JSON)  # type: ignore
-
+# Applied to every new SQLite connection. WAL journal with synchronous=NORMAL only fsyncs on
+# checkpoint rather than every commit, which dominates wall time for the many small upsert
+# transactions of a crawl. NOTE: WAL creates -wal and -shm files alongside the database file.
+_SQLITE_CONNECT_PRAGMAS = (
+    "PRAGMA journal_mode=WAL",
+    "PRAGMA synchronous=NORMAL",
+    "PRAGMA temp_store=MEMORY",
+    # Negative value is size in KiB, ie 64MiB
+    "PRAGMA cache_size=-65536",
+    # Memory-map up to 256MiB of the database file so reads avoid a read() syscall per page.
+    "PRAGMA mmap_size=268435456",
+)
 
 # Copied from https://stackoverflow.com/a/23175518
 # SQLAlchemy does not map BigInt to Int by default on the sqlite dialect (even though " a column
@@ -50,6 +63,22 @@ BigIntegerForPrimaryKeyType = BigIntegerForPrimaryKeyType.with_variant(
 )
 BigIntegerForPrimaryKeyType = BigIntegerForPrimaryKeyType.with_variant(sqlite.INTEGER(), "sqlite")
 
+# Dialect specific insert() constructs, which unlike the generic one support ON CONFLICT clauses.
+_DIALECT_NAME_TO_INSERT = {
+    "postgresql": postgresql.insert,
+    "sqlite": sqlite.insert,
+}
+
+
+def _repr_if_loaded(obj: "Base", attr_name: str) -> str:
+    """Returns repr of obj's attribute if already loaded, without emitting a query to lazy load it
+    (so that printing or logging ORM objects does not issue SQL)."""
+    state = inspect(obj)
+    # Objects not yet in the database (ie without identity) never load from it
+    if state.has_identity and attr_name in state.unloaded:
+        return "<not loaded>"
+    return repr(getattr(obj, attr_name))
+
 
 class Base(DeclarativeBase):
     metadata = MetaData(
@@ -135,7 +164,9 @@ videos_to_crawls_association_table = Table(
     "videos_to_crawls",
     Base.metadata,
     Column("video_id", ForeignKey("video.id"), primary_key=True),
-    Column("crawl_id", ForeignKey("crawl.id"), primary_key=True),
+    # Primary key index is (video_id, crawl_id), so looking up the videos of a crawl needs its own
+    # index.
+    Column("crawl_id", ForeignKey("crawl.id"), primary_key=True, index=True),
 )
 
 
@@ -149,7 +180,7 @@ class Video(Base):
     video_id = synonym("id")
     item_id = synonym("id")
 
-    create_time: Mapped[datetime.datetime] = mapped_column(DateTime(timezone=False))
+    create_time: Mapped[datetime.datetime] = mapped_column(DateTime(timezone=False), index=True)
 
     username: Mapped[str]
     region_code: Mapped[str] = mapped_column(String(2))
@@ -161,8 +192,14 @@ class Video(Base):
     share_count: Mapped[int | None] = mapped_column(BigInteger, nullable=True)
     view_count: Mapped[int | None] = mapped_column(BigInteger, nullable=True)
 
-    effects: Mapped[set[Effect]] = relationship(secondary=videos_to_effect_ids_association_table)
-    hashtags: Mapped[set[Hashtag]] = relationship(secondary=videos_to_hashtags_association_table)
+    # Hashtags, effects, and crawl tags are loaded with one SELECT ... IN per batch of loaded
+    # videos, rather than one SELECT per video when accessed (eg via hashtag_names).
+    effects: Mapped[set[Effect]] = relationship(
+        secondary=videos_to_effect_ids_association_table, lazy="selectin"
+    )
+    hashtags: Mapped[set[Hashtag]] = relationship(
+        secondary=videos_to_hashtags_association_table, lazy="selectin"
+    )
 
     playlist_id: Mapped[int | None] = mapped_column(BigInteger, nullable=True)
     voice_to_text: Mapped[str | None]
@@ -178,15 +215,19 @@ class Video(Base):
     )
 
     crawl_tags: Mapped[set[CrawlTag]] = relationship(
-        secondary=videos_to_crawl_tags_association_table
+        secondary=videos_to_crawl_tags_association_table, lazy="selectin"
     )
-    extra_data = Column(MUTABLE_JSON, nullable=True)  # For future data I haven't thought of yet
+    # Plain JSON without in-place mutation tracking (ie no MutableDict), since videos are written
+    # via upsert_videos, not by mutating loaded objects, so change tracking would only add overhead
+    # to every loaded row. Assign a new dict to persist changes to a loaded Video.
+    extra_data = Column(JSON, nullable=True)  # For future data I haven't thought of yet
 
     def __repr__(self) -> str:
         return (
             f"Video (id={self.id!r}, username={self.username!r}, "
-            f"hashtags={self.hashtags!r}, "
-            f"crawl_tags={self.crawl_tags!r}, crawls={self.crawls!r}"
+            f"hashtags={_repr_if_loaded(self, 'hashtags')}, "
+            f"crawl_tags={_repr_if_loaded(self, 'crawl_tags')}, "
+            f"crawls={_repr_if_loaded(self, 'crawls')}"
         )
 
     @property
@@ -234,88 +275,51 @@ class Comment(Base):
     create_time: Mapped[datetime.datetime] = mapped_column(DateTime(timezone=False))
 
 
-# TODO(macpd): make generic method for this and use for all many-to-many objects inserted with video
-def _get_hashtag_name_to_hashtag_object_map(
-    session: Session, video_data: Sequence[Mapping[str, Any]]
-) -> Mapping[str, Hashtag]:
-    """Gets hashtag name -> Hashtag object map, pulling existing Hashtag objects from database and
-    creating new Hashtag objects for new hashtag names.
-    """
-    # Get all hashtag names references in this list of videos
-    hashtag_names_referenced = set(
-        itertools.chain.from_iterable([video.get("hashtag_names", []) for video in video_data])
-    )
-    # Of all the referenced hashtag names get those which exist in the database
-    hashtag_name_to_hashtag = {
-        row.name: row
-        for row in session.scalars(
-            select(Hashtag).where(Hashtag.name.in_(hashtag_names_referenced))
-        )
-    }
-    # Make new hashtag objects for hashtag names not yet in the database
-    existing_hashtag_names = set(hashtag_name_to_hashtag.keys())
-    new_hashtag_names = hashtag_names_referenced - existing_hashtag_names
-    for hashtag_name in new_hashtag_names:
-        hashtag_name_to_hashtag[hashtag_name] = Hashtag(name=hashtag_name)
-
-    session.add_all(hashtag_name_to_hashtag.values())
-    return hashtag_name_to_hashtag
-
-
-def _get_crawl_tag_set(
-    session: Session, crawl_tags: Sequence[CrawlTag] | Sequence[str] | None
-) -> set[CrawlTag]:
-    """Gets crawl_tag name -> CrawlTag object map, pulling existing CrawlTag objects from database
-    and creating new CrawlTag objects for new crawl_tag names.
+def _get_or_create_ids(
+    session: Session, insert, key_columns_and_keys: Sequence[tuple[type[Base], Any, set[str]]]
+) -> list[Mapping[str, int]]:
+    """For each (model, key_column, keys) gets key -> id map for rows of model whose key_column is
+    in keys, inserting rows for keys not yet in the database.
+
+    Existing ids for all models are selected with a single UNION ALL statement. Rows are inserted
+    with ON CONFLICT DO NOTHING, so rows inserted concurrently by another writer do not cause an
+    error (their ids are selected instead).
     """
-    if not crawl_tags:
-        return set()
-    crawl_tags = [
-        CrawlTag(name=crawl_tag) if isinstance(crawl_tag, str) else crawl_tag
-        for crawl_tag in crawl_tags
+    key_to_id_maps = [{} for _ in key_columns_and_keys]
+    # Models are distinguished in the UNION ALL result by their index in key_columns_and_keys
+    existing_ids_selects = [
+        select(literal(i).label("i"), key_column.label("key"), model.id).where(key_column.in_(keys))
+        for i, (model, key_column, keys) in enumerate(key_columns_and_keys)
+        if keys
     ]
-    # Get all crawl_tag names references in this list of videos
-    crawl_tag_names_referenced = {crawl_tag.name for crawl_tag in crawl_tags}
-    # Of all the referenced crawl_tag names get those which exist in the database
-    crawl_tag_name_to_crawl_tag = {
-        row.name: row
-        for row in session.scalars(
-            select(CrawlTag).where(CrawlTag.name.in_(crawl_tag_names_referenced))
-        )
-    }
-    # Make new crawl_tag objects for crawl_tag names not yet in the database
-    existing_crawl_tag_names = set(crawl_tag_name_to_crawl_tag.keys())
-    new_crawl_tag_names = crawl_tag_names_referenced - existing_crawl_tag_names
-    for crawl_tag_name in new_crawl_tag_names:
-        crawl_tag_name_to_crawl_tag[crawl_tag_name] = CrawlTag(name=crawl_tag_name)
-    session.add_all(crawl_tag_name_to_crawl_tag.values())
-    return set(crawl_tag_name_to_crawl_tag.values())
-
-
-def _get_effect_id_to_effect_object_map(
-    session: Session, video_data: Sequence[Mapping[str, Any]]
-) -> Mapping[str, Effect]:
-    """Gets effect id -> Effect object map, pulling existing Effect objects from database and
-    creating new Effect objects for new effect ids.
-    """
-    # Get all effect ids references in this list of videos
-    effect_ids_referenced = set(
-        itertools.chain.from_iterable([video.get("effect_ids", []) for video in video_data])
-    )
-    # Of all the referenced effect ids get those which exist in the database
-    effect_id_to_effect = {
-        row.effect_id: row
-        for row in session.scalars(
-            select(Effect).where(Effect.effect_id.in_(effect_ids_referenced))
+    if not existing_ids_selects:
+        return key_to_id_maps
+    for i, key, id_ in session.execute(union_all(*existing_ids_selects)).all():
+        key_to_id_maps[i][key] = id_
+
+    for (model, key_column, keys), key_to_id in zip(
+        key_columns_and_keys, key_to_id_maps, strict=True
+    ):
+        new_keys = keys - key_to_id.keys()
+        if not new_keys:
+            continue
+        key_to_id.update(
+            session.execute(
+                insert(model)
+                .on_conflict_do_nothing(index_elements=[key_column])
+                .returning(key_column, model.id),
+                [{key_column.key: key} for key in new_keys],
+            ).all()
         )
-    }
-    # Make new effect objects for effect ids not yet in the database
-    existing_effect_ids = set(effect_id_to_effect.keys())
-    new_effect_ids = effect_ids_referenced - existing_effect_ids
-    for effect_id in new_effect_ids:
-        effect_id_to_effect[effect_id] = Effect(effect_id=effect_id)
-    session.add_all(effect_id_to_effect.values())
-    return effect_id_to_effect
+        # Rows skipped due to conflict are not returned
+        concurrently_inserted_keys = new_keys - key_to_id.keys()
+        if concurrently_inserted_keys:
+            key_to_id.update(
+                session.execute(
+                    select(key_column, model.id).where(key_column.in_(concurrently_inserted_keys))
+                ).all()
+            )
+    return key_to_id_maps
 
 
 def upsert_user_info(user_info_sequence: Sequence[Mapping[str, str | int]], engine: Engine):
@@ -329,14 +333,36 @@ def upsert_user_info(user_info_sequence: Sequence[Mapping[str, str | int]], engi
 def upsert_comments(comments: Sequence[Mapping[str, str | int]], engine: Engine):
     with Session(engine) as session:
         for comment in comments:
-            comment_copy = copy.deepcopy(comment)
-            comment_copy["create_time"] = datetime.datetime.fromtimestamp(
-                comment_copy["create_time"]
+            session.merge(
+                Comment(
+                    **{
+                        **comment,
+                        "create_time": datetime.datetime.fromtimestamp(comment["create_time"]),
+                    }
+                )
             )
-            session.merge(Comment(**comment_copy))
         session.commit()
 
 
+def _dialect_insert(engine: Engine):
+    """Returns the dialect specific insert() construct for engine."""
+    try:
+        return _DIALECT_NAME_TO_INSERT[engine.dialect.name]
+    except KeyError:
+        raise NotImplementedError(
+            f"Upsert not supported for database dialect {engine.dialect.name}"
+        ) from None
+
+
+def _group_by_keys(rows: Sequence[Mapping[str, Any]]) -> Mapping[tuple[str, ...], list]:
+    """Groups rows by their set of keys, so that each group can be sent as a single executemany
+    statement."""
+    keys_to_rows = {}
+    for row in rows:
+        keys_to_rows.setdefault(tuple(sorted(row.keys())), []).append(row)
+    return keys_to_rows
+
+
 def upsert_videos(
     video_data: Sequence[dict[str, Any]],
     crawl_id: int,
@@ -345,60 +371,149 @@ def upsert_videos(
 ):
     """
     Columns must be the same when doing a upsert which is annoying since we have
-        different rows w/ different cols - Instead we just do a custom upsert
+        different rows w/ different cols - Instead rows are grouped by their set of columns and each
+        group is written with a single executemany statement.
 
-    I.e.
-        stmt = sqlite_upsert(Video).values(videos)
-        stmt = stmt.on_conflict_do_update(...)
-    does not work
+    Videos already in the database are updated (only the columns present in the video data), new
+    videos are inserted with INSERT ... ON CONFLICT DO UPDATE. Hashtags and effects of a video are
+    replaced by those in video data (if present), crawls and crawl tags are added to those the
+    video already has.
     """
+    insert = _dialect_insert(engine)
     with Session(engine) as session:
-        # Get all hashtag names references in this list of videos
-        hashtag_name_to_hashtag = _get_hashtag_name_to_hashtag_object_map(session, video_data)
-
-        # Get all crawl_tag names references in this list of videos
-        crawl_tags_set = _get_crawl_tag_set(session, crawl_tags)
-
-        # Get all effect ids references in this list of videos
-        effect_id_to_effect = _get_effect_id_to_effect_object_map(session, video_data)
+        # Get (creating if needed) ids of all hashtags, effects, and crawl tags referenced
+        hashtag_name_to_id, effect_id_to_id, crawl_tag_name_to_id = _get_or_create_ids(
+            session,
+            insert,
+            [
+                (
+                    Hashtag,
+                    Hashtag.name,
+                    {name for video in video_data for name in video.get("hashtag_names", ())},
+                ),
+                (
+                    Effect,
+                    Effect.effect_id,
+                    {
+                        effect_id
+                        for video in video_data
+                        for effect_id in video.get("effect_ids", ())
+                    },
+                ),
+                (
+                    CrawlTag,
+                    CrawlTag.name,
+                    {
+                        crawl_tag if isinstance(crawl_tag, str) else crawl_tag.name
+                        for crawl_tag in crawl_tags or []
+                    },
+                ),
+            ],
+        )
+        crawl_tag_ids = set(crawl_tag_name_to_id.values())
 
         video_id_to_video = {}
-        crawl = set(session.scalars(select(Crawl).where(Crawl.id == crawl_id)).all())
+        video_id_to_hashtag_ids = {}
+        video_id_to_effect_ids = {}
+        crawl_exists = session.scalar(select(Crawl.id).where(Crawl.id == crawl_id)) is not None
 
         for vid in video_data:
-            # manually add the source, keeping the original dict intact
-            new_vid = copy.deepcopy(vid)
-            new_vid["crawls"] = crawl
+            # Shallow copy is enough to keep the original dict intact, since only top level keys are
+            # replaced or removed.
+            new_vid = dict(vid)
             new_vid["create_time"] = datetime.datetime.fromtimestamp(vid["create_time"])
-            if "effect_ids" in vid:
-                new_vid["effects"] = {
-                    effect_id_to_effect[effect_id] for effect_id in vid["effect_ids"]
+            if "effect_ids" in new_vid:
+                video_id_to_effect_ids[vid["id"]] = {
+                    effect_id_to_id[effect_id] for effect_id in new_vid.pop("effect_ids")
                 }
-                del new_vid["effect_ids"]
-            if "hashtag_names" in vid:
-                new_vid["hashtags"] = {
-                    hashtag_name_to_hashtag[hashtag_name] for hashtag_name in vid["hashtag_names"]
+            if "hashtag_names" in new_vid:
+                video_id_to_hashtag_ids[vid["id"]] = {
+                    hashtag_name_to_id[hashtag_name]
+                    for hashtag_name in new_vid.pop("hashtag_names")
                 }
-                del new_vid["hashtag_names"]
-            if crawl_tags_set:
-                new_vid["crawl_tags"] = crawl_tags_set
 
             video_id_to_video[vid["id"]] = new_vid
 
-        # Taken from https://stackoverflow.com/questions/25955200/sqlalchemy-performing-a-bulk-upsert-if-exists-update-else-insert-in-postgr
+        existing_video_ids = set(
+            session.scalars(select(Video.id).where(Video.id.in_(video_id_to_video.keys())))
+        )
 
-        # Merge all the videos that already exist
-        for each in session.scalars(select(Video).where(Video.id.in_(video_id_to_video.keys()))):
-            new_vid = Video(**video_id_to_video.pop(each.id))
-            new_vid.crawl_tags.update(each.crawl_tags)
-            new_vid.crawls.update(each.crawls)
-            session.merge(new_vid)
+        # Update the columns present in video data of videos that already exist
+        existing_videos = [video_id_to_video[video_id] for video_id in existing_video_ids]
+        if existing_videos:
+            session.execute(update(Video), existing_videos)
+
+        # Insert new videos. ON CONFLICT handles videos inserted since we checked which exist.
+        new_videos = [
+            video
+            for video_id, video in video_id_to_video.items()
+            if video_id not in existing_video_ids
+        ]
+        for columns, rows in _group_by_keys(new_videos).items():
+            stmt = insert(Video)
+            stmt = stmt.on_conflict_do_update(
+                index_elements=[Video.id],
+                set_={
+                    **{column: stmt.excluded[column] for column in columns if column != "id"},
+                    "crawled_updated_at": func.now(),
+                },
+            )
+            session.execute(stmt, rows)
+
+        # Hashtags and effects in video data replace those the video previously had
+        for association_table, column_name, video_id_to_ids in (
+            (videos_to_hashtags_association_table, "hashtag_id", video_id_to_hashtag_ids),
+            (videos_to_effect_ids_association_table, "effect_id", video_id_to_effect_ids),
+        ):
+            replaced_video_ids = existing_video_ids & video_id_to_ids.keys()
+            if replaced_video_ids:
+                session.execute(
+                    delete(association_table).where(
+                        association_table.c.video_id.in_(replaced_video_ids)
+                    )
+                )
+            _insert_association_rows(
+                session,
+                insert,
+                association_table,
+                [
+                    {"video_id": video_id, column_name: id_}
+                    for video_id, ids in video_id_to_ids.items()
+                    for id_ in ids
+                ],
+            )
 
-        session.add_all(Video(**vid) for vid in video_id_to_video.values())
+        # Crawls and crawl tags are added to those the video already has
+        if crawl_exists:
+            _insert_association_rows(
+                session,
+                insert,
+                videos_to_crawls_association_table,
+                [{"video_id": video_id, "crawl_id": crawl_id} for video_id in video_id_to_video],
+            )
+        _insert_association_rows(
+            session,
+            insert,
+            videos_to_crawl_tags_association_table,
+            [
+                {"video_id": video_id, "crawl_tag_id": crawl_tag_id}
+                for video_id in video_id_to_video
+                for crawl_tag_id in crawl_tag_ids
+            ],
+        )
 
         session.commit()
 
 
+def _insert_association_rows(
+    session: Session, insert, association_table: Table, rows: Sequence[Mapping[str, Any]]
+) -> None:
+    """Inserts rows into many-to-many association table, ignoring rows that already exist."""
+    if not rows:
+        return
+    session.execute(insert(association_table).on_conflict_do_nothing(), rows)
+
+
 class Crawl(Base):
     __tablename__ = "crawl"
 
@@ -422,11 +537,12 @@ class Crawl(Base):
     crawl_tags: Mapped[set[CrawlTag]] = relationship(
         secondary=crawls_to_crawl_tags_association_table
     )
-    extra_data = Column(MUTABLE_JSON, nullable=True)  # For future data I haven't thought of yet
+    # Not mutation tracked (see Video.extra_data); assign a new dict to persist changes.
+    extra_data = Column(JSON, nullable=True)  # For future data I haven't thought of yet
 
     def __repr__(self) -> str:
         return (
-            f"Crawl id={self.id}, crawl_tags={self.crawl_tags!r}, "
+            f"Crawl id={self.id}, crawl_tags={_repr_if_loaded(self, 'crawl_tags')}, "
             f"started_at={self.crawl_started_at!r}, cursor={self.cursor}, "
             f"has_more={self.has_more!r}, search_id={self.search_id!r}\n"
             f"query='{self.query!r}'"
@@ -470,6 +586,21 @@ class Crawl(Base):
             crawl_tags=({CrawlTag(name=name) for name in crawl_tags} if crawl_tags else set()),
         )
 
+    def progress_snapshot(self) -> "Crawl":
+        """Returns a new (transient) Crawl with this crawl's id, query, crawl tags, and current
+        progress fields (cursor, has_more, search_id, etc). Used to store this crawl's progress as
+        of now from another thread, while this crawl continues to be updated."""
+        return Crawl(
+            id=self.id,
+            query=self.query,
+            cursor=self.cursor,
+            has_more=self.has_more,
+            search_id=self.search_id,
+            updated_at=self.updated_at,
+            extra_data=self.extra_data,
+            crawl_tags=set(self.crawl_tags),
+        )
+
     def upload_self_to_db(self, engine: Engine) -> None:
         """Uploads current instance to DB"""
         with Session(engine, expire_on_commit=False) as session:
@@ -491,18 +622,60 @@ class Crawl(Base):
                 session.add(self)
             session.commit()
 
+    def update_progress_in_db(self, engine: Engine) -> None:
+        """Writes the fields that change as a crawl progresses (cursor, has_more, search_id, etc)
+        to this crawl's existing DB row with a single UPDATE. Unlike upload_self_to_db this does not
+        sync crawl_tags. Falls back to upload_self_to_db if the row does not exist yet."""
+        if self.id is None:
+            self.upload_self_to_db(engine)
+            return
+
+        with Session(engine) as session:
+            result = session.execute(
+                update(Crawl)
+                .where(Crawl.id == self.id)
+                .values(
+                    cursor=self.cursor,
+                    has_more=self.has_more,
+                    search_id=self.search_id,
+                    updated_at=self.updated_at,
+                    extra_data=self.extra_data,
+                )
+            )
+            session.commit()
+
+        if result.rowcount == 0:
+            self.upload_self_to_db(engine)
+
 
 def get_sqlite_engine_and_create_tables(db_path: Path, **kwargs) -> Engine:
     return get_engine_and_create_tables(f"sqlite:///{db_path.absolute()}", **kwargs)
 
 
 def get_engine_and_create_tables(db_url: str, **kwargs) -> Engine:
-    engine = create_engine(db_url, **kwargs)
+    if make_url(db_url).get_backend_name() == "sqlite":
+        engine = create_engine(db_url, **kwargs)
+        event.listen(engine, "connect", _set_sqlite_connect_pragmas)
+    else:
+        # Reuse the most recently returned connection (keeping it warm). Crawls can sit idle for
+        # hours waiting on API quota, so replace connections older than an hour on checkout
+        # rather than reusing ones the server may have dropped. Unlike pool_pre_ping this does not
+        # add a round-trip to every checkout.
+        kwargs.setdefault("pool_use_lifo", True)
+        kwargs.setdefault("pool_recycle", 3600)
+        engine = create_engine(db_url, **kwargs)
     create_tables(engine)
 
     return engine
 
 
+def _set_sqlite_connect_pragmas(dbapi_connection, connection_record) -> None:
+    cursor = dbapi_connection.cursor()
+    for pragma in _SQLITE_CONNECT_PRAGMAS:
+        cursor.execute(pragma)
+    cursor.close()
+
+
 def create_tables(engine: Engine) -> None:
     Base.metadata.create_all(engine, checkfirst=True)
 
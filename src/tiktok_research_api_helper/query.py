@@ -6,7 +6,7 @@ from typing import Any
 import attrs
 
 from tiktok_research_api_helper import utils
-from tiktok_research_api_helper.region_codes import SupportedRegions
+from tiktok_research_api_helper.region_codes import SupportedRegions, _supported_regions_values
 
 _QUERY_AND_ARG_NAME = "and_"
 _QUERY_NOT_ARG_NAME = "not_"
@@ -34,7 +34,7 @@ class VideoLength(enum.StrEnum):
     EXTRA_LONG = "EXTRA_LONG"
 
 
-@attrs.define
+@attrs.define(frozen=True)
 class _Field:
     name: str
     validator: Callable
@@ -55,11 +55,8 @@ class Fields:
     music_id = _Field("music_id", validator=attrs.validators.instance_of(str))
     effect_id = _Field("effect_id", validator=attrs.validators.instance_of(str))
 
-    region_code = _Field(
-        "region_code",
-        validator=attrs.validators.in_({region.value for region in SupportedRegions}),
-    )
-    video_length = _Field("video_length", validator=attrs.validators.in_(VideoLength))
+    region_code = _Field("region_code", validator=attrs.validators.in_(_supported_regions_values))
+    video_length = _Field("video_length", validator=attrs.validators.in_(frozenset(VideoLength)))
 
     create_date = _Field("create_date", validator=check_can_convert_date)
 
@@ -74,14 +71,16 @@ def convert_str_or_strseq_to_strseq(element_or_list: str | Sequence[str]) -> Seq
     return element_or_list
 
 
-@attrs.define
+@attrs.define(frozen=True)
 class Condition:
     field: _Field
     field_values: str | Sequence[str] = attrs.field(
         converter=convert_str_or_strseq_to_strseq,
         validator=attrs.validators.instance_of((str, Sequence)),
     )
-    operation: str = attrs.field(validator=attrs.validators.in_(Operations))
+    # frozenset so that plain string operations (ie "EQ") are accepted, and membership is a hash
+    # lookup rather than Enum.__contains__
+    operation: str = attrs.field(validator=attrs.validators.in_(frozenset(Operations)))
 
     @field_values.validator  # type: ignore - attrs does not support type hinting for validators
     def validate_field_values(self, attribute, value):
@@ -127,7 +126,7 @@ def convert_optional_cond_or_condseq_to_condseq(
     return optional_cond_or_seq
 
 
-@attrs.define
+@attrs.define(frozen=True)
 class VideoQuery:
     and_: OptionalCondOrCondSeq = attrs.field(
         default=None, converter=convert_optional_cond_or_condseq_to_condseq
@@ -170,18 +169,18 @@ def generate_video_id_query(video_id_list: Sequence[int]) -> VideoQuery:
 def get_normalized_hashtag_set(comma_separated_hashtags: str) -> set[str]:
     """Takes a string of comma separated hashtag names and returns a set of hashtag names all
     lowercase and stripped of leading "#" if present."""
-    return {hashtag.lstrip("#").lower() for hashtag in comma_separated_hashtags.split(",")}
+    return {hashtag.lstrip("#") for hashtag in comma_separated_hashtags.lower().split(",")}
 
 
 def get_normalized_keyword_set(comma_separated_keywords: str) -> set[str]:
     """Takes a string of comma separated keywords and returns a set of keywords all lowercase"""
-    return {keyword.lower() for keyword in comma_separated_keywords.split(",")}
+    return set(comma_separated_keywords.lower().split(","))
 
 
 def get_normalized_username_set(comma_separated_usernames: str) -> set[str]:
     """Takes a string of comma separated usernames and returns a set of usernames all lowercase with
     any @ symbols remove"""
-    return {username.strip("@").lower() for username in comma_separated_usernames.split(",")}
+    return {username.strip("@") for username in comma_separated_usernames.lower().split(",")}
 
 
 def any_hashtags_condition(hashtags):
@@ -254,4 +254,4 @@ class SupportedRegions(enum.StrEnum):
     RU = "RU"
 
 
-_supported_regions_values = {region.value for region in SupportedRegions}
+_supported_regions_values = frozenset(region.value for region in SupportedRegions)
@@ -3,9 +3,6 @@ import logging
 from collections import namedtuple
 from pathlib import Path
 
-from rich.console import Console
-from rich.logging import RichHandler
-
 TIKTOK_DATE_FORMAT = "%Y%m%d"
 # time.strftime (which logging uses to format asctime) does not have a directive for microseconds,
 # so we use this date format and %(asctime)s,%(msecs)d to get the microseconds in the record
@@ -26,6 +23,14 @@ def int_to_days(x: int) -> datetime.timedelta:
 
 
 def str_tiktok_date_format_to_datetime(string: str) -> datetime.datetime:
+    # Fast path for the common well formed YYYYMMDD case, which avoids strptime's format parsing
+    # and locale machinery. Anything else (including invalid dates like 20241301) goes through
+    # strptime so errors are reported the same way.
+    if len(string) == 8 and string.isascii() and string.isdigit():
+        try:
+            return datetime.datetime(int(string[:4]), int(string[4:6]), int(string[6:]))
+        except ValueError:
+            pass
     return datetime.datetime.strptime(string, TIKTOK_DATE_FORMAT)
 
 
@@ -62,6 +67,24 @@ def make_crawl_date_window(
     return crawl_date_window
 
 
+def make_query_date_windows(
+    start_date: datetime.date,
+    end_date: datetime.date,
+    max_days_per_window: datetime.timedelta,
+) -> list[CrawlDateWindow]:
+    """Splits the span between start_date and end_date into CrawlDateWindows at most
+    max_days_per_window long. The last window's end_date is clamped to end_date.
+    """
+    num_windows = (end_date - start_date) // max_days_per_window + 1
+    return [
+        CrawlDateWindow(
+            start_date=start_date + i * max_days_per_window,
+            end_date=min(start_date + (i + 1) * max_days_per_window, end_date),
+        )
+        for i in range(num_windows)
+    ]
+
+
 def crawl_date_window_is_behind_today(crawl_date_window: CrawlDateWindow, crawl_lag: int) -> bool:
     end_date = crawl_date_window.end_date.date()
     today = datetime.date.today()
@@ -88,10 +111,14 @@ def setup_logging_debug_level() -> None:
 def setup_logging(file_level=logging.INFO, rich_level=logging.INFO) -> None:
     """Creates a new log file in ./logs/ with current date as filename, and configures logging
     format and levels."""
+    # Imported here since rich is only needed for logging setup, and is slow to import for users
+    # of this module's date helpers (ie query.py).
+    from rich.console import Console
+    from rich.logging import RichHandler
 
     file_dir = Path("./logs/")
     if not file_dir.exists():
-        logging.log(logging.INFO, f"Creating log directory: {file_dir}")
+        logging.info("Creating log directory: %s", file_dir)
         file_dir.mkdir(parents=True)
 
     file_name = Path(file_dir / str(datetime.datetime.now()))
@@ -2,11 +2,15 @@ import copy
 import itertools
 import json
 import re
+import threading
+import time
 import unittest
 from unittest.mock import MagicMock, Mock, PropertyMock, call
 
+import attrs
 import pendulum
 import pytest
+import requests
 import responses
 from sqlalchemy.orm import Session
 
@@ -16,6 +20,7 @@ from tests.common import (
     all_videos,
 )
 from tiktok_research_api_helper import api_client, utils
+from tiktok_research_api_helper.models import get_engine_and_create_tables
 
 # TODO(macpd): use response library to mock out requests to API such that they return contents of
 # "tests/testdata/api_videos_response_unicode.json"
@@ -144,6 +149,130 @@ def test_tiktok_api_request_client_attempts_token_refresh(
     assert mocked_access_token_fetch.call_count == 1
 
 
+def test_tiktok_api_request_client_writes_raw_responses(
+    tmp_path,
+    basic_video_query,
+    responses_mock,
+    mocked_access_token_fetch,
+    testdata_api_videos_response_page_2_of_2_json,
+):
+    responses_mock.post(
+        RESPONSES_MOCK_VIDEO_QUERY_URL_REGEX,
+        json=testdata_api_videos_response_page_2_of_2_json,
+    )
+    request_client = api_client.TikTokApiRequestClient.from_credentials_file(
+        FAKE_SECRETS_YAML_FILE,
+        raw_responses_output_dir=tmp_path,
+    )
+    request_client.fetch_videos(
+        api_client.TikTokVideoRequest(query=basic_video_query, start_date=None, end_date=None)
+    )
+    # Wait for background write to complete
+    request_client.close()
+    raw_response_files = list(tmp_path.iterdir())
+    assert len(raw_response_files) == 1
+    assert (
+        json.loads(raw_response_files[0].read_bytes())
+        == testdata_api_videos_response_page_2_of_2_json
+    )
+
+
+def test_tiktok_api_request_clients_write_raw_responses_to_unique_files(
+    tmp_path,
+    basic_video_query,
+    responses_mock,
+    mocked_access_token_fetch,
+    testdata_api_videos_response_page_2_of_2_json,
+):
+    responses_mock.post(
+        RESPONSES_MOCK_VIDEO_QUERY_URL_REGEX,
+        json=testdata_api_videos_response_page_2_of_2_json,
+    )
+    request_clients = [
+        api_client.TikTokApiRequestClient.from_credentials_file(
+            FAKE_SECRETS_YAML_FILE,
+            raw_responses_output_dir=tmp_path,
+        )
+        for _ in range(2)
+    ]
+    request = api_client.TikTokVideoRequest(query=basic_video_query, start_date=None, end_date=None)
+    # Responses received at the same time, eg by parallel queries.
+    with unittest.mock.patch.object(
+        api_client.pendulum, "now", return_value=pendulum.datetime(2024, 6, 1)
+    ):
+        for request_client in request_clients:
+            request_client.fetch_videos(request)
+            request_client.fetch_videos(request)
+    for request_client in request_clients:
+        request_client.close()
+    assert len(list(tmp_path.iterdir())) == 4
+
+
+def test_tiktok_api_request_client_bounds_pending_raw_response_writes(
+    monkeypatch,
+    tmp_path,
+    basic_video_query,
+    responses_mock,
+    mocked_access_token_fetch,
+    testdata_api_videos_response_page_2_of_2_json,
+):
+    responses_mock.post(
+        RESPONSES_MOCK_VIDEO_QUERY_URL_REGEX,
+        json=testdata_api_videos_response_page_2_of_2_json,
+    )
+    monkeypatch.setattr(api_client, "MAX_PENDING_RAW_RESPONSE_WRITES", 1)
+    write_raw_response = api_client._write_raw_response
+    allow_writes = threading.Event()
+
+    def slow_write_raw_response(*args, **kwargs):
+        allow_writes.wait()
+        write_raw_response(*args, **kwargs)
+
+    monkeypatch.setattr(api_client, "_write_raw_response", slow_write_raw_response)
+    request_client = api_client.TikTokApiRequestClient.from_credentials_file(
+        FAKE_SECRETS_YAML_FILE,
+        raw_responses_output_dir=tmp_path,
+    )
+    request = api_client.TikTokVideoRequest(query=basic_video_query, start_date=None, end_date=None)
+    request_client.fetch_videos(request)
+
+    second_fetch = threading.Thread(target=request_client.fetch_videos, args=(request,))
+    second_fetch.start()
+    # Second response waits for the first to be written rather than being queued.
+    second_fetch.join(timeout=0.2)
+    assert second_fetch.is_alive()
+
+    allow_writes.set()
+    second_fetch.join(timeout=5)
+    assert not second_fetch.is_alive()
+    request_client.close()
+    assert len(list(tmp_path.iterdir())) == 2
+
+
+def test_tiktok_api_request_client_raises_raw_response_write_error(
+    tmp_path,
+    basic_video_query,
+    responses_mock,
+    mocked_access_token_fetch,
+    testdata_api_videos_response_page_2_of_2_json,
+):
+    responses_mock.post(
+        RESPONSES_MOCK_VIDEO_QUERY_URL_REGEX,
+        json=testdata_api_videos_response_page_2_of_2_json,
+    )
+    request_client = api_client.TikTokApiRequestClient.from_credentials_file(
+        FAKE_SECRETS_YAML_FILE,
+        # Writes fail since directory does not exist
+        raw_responses_output_dir=tmp_path / "does_not_exist",
+    )
+    request = api_client.TikTokVideoRequest(query=basic_video_query, start_date=None, end_date=None)
+    request_client.fetch_videos(request)
+    with pytest.raises(FileNotFoundError):
+        request_client.close()
+    # Error is only raised once
+    request_client.close()
+
+
 @unittest.mock.patch("tenacity.nap.time.sleep")
 def test_tiktok_api_request_client_retry_once_on_json_decoder_error(
     mock_sleep,
@@ -164,6 +293,25 @@ def test_tiktok_api_request_client_retry_once_on_json_decoder_error(
     mock_sleep.assert_called_once_with(0)
 
 
+@unittest.mock.patch("tenacity.nap.time.sleep")
+def test_tiktok_api_request_client_logs_request_body_as_text_on_unexpected_status(
+    mock_sleep,
+    caplog,
+    responses_mock,
+    mocked_access_token_fetch,
+    basic_video_query,
+):
+    responses_mock.post(RESPONSES_MOCK_VIDEO_QUERY_URL_REGEX, status=404)
+    request_client = api_client.TikTokApiRequestClient.from_credentials_file(
+        FAKE_SECRETS_YAML_FILE,
+    )
+    request = api_client.TikTokVideoRequest(query=basic_video_query, start_date=None, end_date=None)
+    with pytest.raises(requests.HTTPError):
+        request_client.fetch_videos(request)
+    assert f"data {request.as_json()}" in caplog.text
+    assert "b'" not in caplog.text
+
+
 @pytest.mark.parametrize("num_retries", range(1, 6))
 @unittest.mock.patch("tenacity.nap.time.sleep")
 def test_tiktok_api_request_client_wait_one_hour_on_rate_limit_wait_strategy(
@@ -640,6 +788,103 @@ def test_tiktok_api_client_fetch_and_store_all(
     )
 
 
+def test_tiktok_api_client_fetch_and_store_all_in_background(
+    tmp_path,
+    basic_acquisition_config,
+    basic_video_query_config,
+    mock_tiktok_request_client,
+    mock_tiktok_video_responses,
+):
+    # In-memory SQLite databases are per-thread, so use a file backed database.
+    database_engine = get_engine_and_create_tables(f"sqlite:///{tmp_path / 'test.db'}")
+    basic_acquisition_config.engine = database_engine
+    client = api_client.TikTokApiClient(
+        request_client=mock_tiktok_request_client, config=basic_acquisition_config
+    )
+    fetch_result = client.fetch_and_store_all(
+        basic_video_query_config, store_results_in_background=True
+    )
+    assert_has_expected_crawl_and_videos_in_database(
+        database_engine=database_engine,
+        fetch_result=fetch_result,
+        tiktok_responses=mock_tiktok_video_responses,
+        acquisition_config=basic_acquisition_config,
+        video_query_config=basic_video_query_config,
+    )
+    database_engine.dispose()
+
+
+def test_tiktok_api_client_fetch_and_store_all_in_background_stores_progress_of_each_response(
+    tmp_path,
+    monkeypatch,
+    basic_acquisition_config,
+    basic_video_query_config,
+    mock_tiktok_request_client,
+    mock_tiktok_video_responses,
+):
+    database_engine = get_engine_and_create_tables(f"sqlite:///{tmp_path / 'test.db'}")
+    basic_acquisition_config.engine = database_engine
+    client = api_client.TikTokApiClient(
+        request_client=mock_tiktok_request_client, config=basic_acquisition_config
+    )
+    stored_cursor_and_video_ids = []
+    store_fetch_result = api_client.TikTokApiClient.store_fetch_result
+
+    def slow_store_fetch_result(self, fetch_result):
+        # Give api_results_iter time to fetch the next page (and update its crawl) while this
+        # response is being stored.
+        time.sleep(0.05)
+        stored_cursor_and_video_ids.append(
+            (fetch_result.crawl.cursor, [video["id"] for video in fetch_result.videos])
+        )
+        store_fetch_result(self, fetch_result)
+
+    monkeypatch.setattr(api_client.TikTokApiClient, "store_fetch_result", slow_store_fetch_result)
+
+    client.fetch_and_store_all(basic_video_query_config, store_results_in_background=True)
+
+    assert stored_cursor_and_video_ids == [
+        (response.data["cursor"], [video["id"] for video in response.videos])
+        for response in mock_tiktok_video_responses
+    ]
+    database_engine.dispose()
+
+
+def test_tiktok_api_client_fetch_all_in_background_raises_store_error_when_fetch_fails(
+    tmp_path,
+    monkeypatch,
+    basic_acquisition_config,
+    basic_video_query_config,
+    mock_tiktok_request_client,
+    mock_tiktok_video_responses,
+):
+    database_engine = get_engine_and_create_tables(f"sqlite:///{tmp_path / 'test.db'}")
+    basic_acquisition_config.engine = database_engine
+    # Second page is stored in the background, and then fetching the third page fails.
+    mock_tiktok_request_client.fetch_videos.side_effect = [
+        *mock_tiktok_video_responses[:2],
+        RuntimeError("fetch failed"),
+    ]
+    client = api_client.TikTokApiClient(
+        request_client=mock_tiktok_request_client, config=basic_acquisition_config
+    )
+    store_fetch_result = api_client.TikTokApiClient.store_fetch_result
+
+    def store_fetch_result_fails_after_first(self, fetch_result):
+        if fetch_result.crawl.id is not None:
+            raise ValueError("store failed")
+        store_fetch_result(self, fetch_result)
+
+    monkeypatch.setattr(
+        api_client.TikTokApiClient, "store_fetch_result", store_fetch_result_fails_after_first
+    )
+
+    with pytest.raises(ValueError, match="store failed") as exc_info:
+        client.fetch_and_store_all(basic_video_query_config, store_results_in_background=True)
+    assert isinstance(exc_info.value.__context__, RuntimeError)
+    database_engine.dispose()
+
+
 @pytest.mark.parametrize(
     ("fetch_comments", "fetch_user_info"),
     # All 4 possible combos of True, False matrix
@@ -710,6 +955,72 @@ def test_tiktok_request_client_fetch_videos_raises_max_api_requests_reached_erro
     assert request_client.num_api_requests_sent == max_api_requests
 
 
+def test_tiktok_request_clients_sharing_request_counter_share_max_api_requests(
+    mocked_access_token_fetch,
+    responses_mock,
+    basic_video_query,
+    testdata_api_videos_response_page_1_of_2_json,
+):
+    max_api_requests = 3
+    for _ in range(max_api_requests):
+        responses_mock.post(
+            RESPONSES_MOCK_VIDEO_QUERY_URL_REGEX,
+            json=testdata_api_videos_response_page_1_of_2_json,
+        )
+    request_counter = api_client.ApiRequestCounter()
+    request_clients = [
+        api_client.TikTokApiRequestClient.from_credentials_file(
+            FAKE_SECRETS_YAML_FILE,
+            max_api_requests=max_api_requests,
+            request_counter=request_counter,
+        )
+        for _ in range(2)
+    ]
+    request = api_client.TikTokVideoRequest(query=basic_video_query, start_date=None, end_date=None)
+
+    request_clients[0].fetch_videos(request)
+    request_clients[1].fetch_videos(request)
+    request_clients[0].fetch_videos(request)
+    assert request_counter.count == max_api_requests
+    for request_client in request_clients:
+        assert request_client.num_api_requests_sent == max_api_requests
+        assert request_client.max_api_requests_reached()
+        with pytest.raises(api_client.MaxApiRequestsReachedError):
+            request_client.fetch_videos(request)
+    assert request_counter.count == max_api_requests
+
+
+@unittest.mock.patch("tenacity.nap.time.sleep")
+def test_tiktok_request_client_does_not_count_requests_without_response(
+    mock_sleep,
+    mocked_access_token_fetch,
+    responses_mock,
+    basic_video_query,
+    testdata_api_videos_response_page_1_of_2_json,
+):
+    # A connection error is retried, and since no response was received it does not count against
+    # max_api_requests.
+    responses_mock.post(
+        RESPONSES_MOCK_VIDEO_QUERY_URL_REGEX, body=requests.ConnectionError("connection reset")
+    )
+    responses_mock.post(
+        RESPONSES_MOCK_VIDEO_QUERY_URL_REGEX,
+        json=testdata_api_videos_response_page_1_of_2_json,
+    )
+    request_client = api_client.TikTokApiRequestClient.from_credentials_file(
+        FAKE_SECRETS_YAML_FILE,
+        max_api_requests=1,
+    )
+    request = api_client.TikTokVideoRequest(query=basic_video_query, start_date=None, end_date=None)
+
+    request_client.fetch_videos(request)
+    # Request was retried after the connection error
+    mock_sleep.assert_called_once()
+    assert request_client.num_api_requests_sent == 1
+    with pytest.raises(api_client.MaxApiRequestsReachedError):
+        request_client.fetch_videos(request)
+
+
 @pytest.mark.parametrize("max_api_requests", range(0, 5))
 def test_tiktok_request_client_fetch_comments_raises_max_api_requests_reached_error_correctly(
     mocked_access_token_fetch,
@@ -848,6 +1159,18 @@ def test_TikTokVideoRequest_as_json(basic_video_query_config):
     }
 
 
+def test_video_query_config_date_strs_follow_dates(basic_video_query_config):
+    assert basic_video_query_config.start_date_str == "20240601"
+    assert basic_video_query_config.end_date_str == "20240601"
+
+    basic_video_query_config.end_date = pendulum.parse("20240605")
+    assert basic_video_query_config.end_date_str == "20240605"
+
+    evolved_config = attrs.evolve(basic_video_query_config, start_date=pendulum.parse("20240603"))
+    assert evolved_config.start_date_str == "20240603"
+    assert evolved_config.end_date_str == "20240605"
+
+
 def test_NullByteRemovingJSONDencoder(
     testdata_api_videos_response_unicode_with_null_bytes_file_contents,
 ):
@@ -864,3 +1187,23 @@ def test_NullByteRemovingJSONDencoder(
             cls=api_client.NullByteRemovingJSONDencoder,
         )["data"]["videos"][0]["username"]
     )
+
+
+def test_tiktok_api_client_store_fetch_result_holds_store_lock(
+    test_database_engine,
+    basic_acquisition_config,
+    basic_video_query_config,
+    mock_tiktok_request_client,
+    mock_tiktok_video_responses,
+):
+    basic_acquisition_config.engine = test_database_engine
+    store_lock = MagicMock()
+    client = api_client.TikTokApiClient(
+        request_client=mock_tiktok_request_client,
+        config=basic_acquisition_config,
+        store_lock=store_lock,
+    )
+    client.fetch_and_store_all(basic_video_query_config)
+    # Lock acquired once per stored API response
+    assert store_lock.__enter__.call_count == len(mock_tiktok_video_responses)
+    assert store_lock.__exit__.call_count == len(mock_tiktok_video_responses)
@@ -0,0 +1,168 @@
+import datetime
+import threading
+import time
+from unittest.mock import MagicMock, patch
+
+import attrs
+import pytest
+
+from tiktok_research_api_helper import api_client
+from tiktok_research_api_helper.cli import main
+from tiktok_research_api_helper.models import get_engine_and_create_tables
+
+
+@pytest.fixture
+def file_database_engine(tmp_path):
+    # In-memory SQLite databases are per-thread, so use a file backed database.
+    engine = get_engine_and_create_tables(f"sqlite:///{tmp_path / 'test.db'}")
+    yield engine
+    engine.dispose()
+
+
+@pytest.fixture
+def ten_day_video_query_config(basic_video_query_config):
+    return attrs.evolve(
+        basic_video_query_config,
+        start_date=datetime.date(2024, 6, 1),
+        end_date=datetime.date(2024, 6, 10),
+    )
+
+
+def test_main_driver_parallel_queries(
+    file_database_engine, basic_acquisition_config, ten_day_video_query_config
+):
+    basic_acquisition_config.engine = file_database_engine
+    clients = []
+    fetched_start_dates = []
+    client_threads = {}
+
+    def make_client(*args, **kwargs):
+        client = MagicMock(spec=api_client.TikTokApiClient)
+
+        def fetch_and_store_all(query_config, store_results_in_background):
+            client_threads.setdefault(id(client), set()).add(threading.get_ident())
+            fetched_start_dates.append(query_config.start_date)
+            assert store_results_in_background
+            # Give the other worker a chance to pick up windows
+            time.sleep(0.01)
+
+        client.fetch_and_store_all.side_effect = fetch_and_store_all
+        clients.append(client)
+        return client
+
+    with patch.object(main.TikTokApiClient, "from_config", side_effect=make_client) as from_config:
+        main.main_driver(
+            basic_acquisition_config,
+            ten_day_video_query_config,
+            max_days_per_query=1,
+            max_parallel_queries=2,
+            store_results_in_background=True,
+        )
+
+    # Every window fetched exactly once
+    assert sorted(fetched_start_dates) == [
+        window.start_date
+        for window in main.utils.make_query_date_windows(
+            ten_day_video_query_config.start_date,
+            ten_day_video_query_config.end_date,
+            main.utils.int_to_days(1),
+        )
+    ]
+    # At most one client per worker thread, each used only by the thread that created it
+    assert 1 <= from_config.call_count <= 2
+    assert all(len(threads) == 1 for threads in client_threads.values())
+    # Clients share a lock serializing SQLite writes, and a request counter
+    store_locks = {id(call.kwargs["store_lock"]) for call in from_config.call_args_list}
+    assert len(store_locks) == 1
+    assert isinstance(from_config.call_args.kwargs["store_lock"], type(threading.Lock()))
+    request_counters = {id(call.kwargs["request_counter"]) for call in from_config.call_args_list}
+    assert len(request_counters) == 1
+    assert isinstance(from_config.call_args.kwargs["request_counter"], api_client.ApiRequestCounter)
+    for client in clients:
+        client.close.assert_called_once()
+
+
+def test_main_driver_parallel_queries_stops_on_first_error(
+    file_database_engine, basic_acquisition_config, ten_day_video_query_config
+):
+    basic_acquisition_config.engine = file_database_engine
+    clients = []
+    fetched_start_dates = []
+
+    def fetch_and_store_all(query_config, store_results_in_background):
+        fetched_start_dates.append(query_config.start_date)
+        if query_config.start_date == ten_day_video_query_config.start_date:
+            raise api_client.ApiRejectedCredentialsError("rejected")
+        time.sleep(0.1)
+
+    def make_client(*args, **kwargs):
+        client = MagicMock(spec=api_client.TikTokApiClient)
+        client.fetch_and_store_all.side_effect = fetch_and_store_all
+        clients.append(client)
+        return client
+
+    with (
+        patch.object(main.TikTokApiClient, "from_config", side_effect=make_client),
+        pytest.raises(api_client.ApiRejectedCredentialsError),
+    ):
+        main.main_driver(
+            basic_acquisition_config,
+            ten_day_video_query_config,
+            max_days_per_query=1,
+            max_parallel_queries=2,
+        )
+
+    # Remaining windows were cancelled rather than fetched
+    assert len(fetched_start_dates) < 10
+    # Clients are still closed, so pending raw response writes are flushed
+    assert clients
+    for client in clients:
+        client.close.assert_called_once()
+
+
+def test_main_driver_closes_client_on_error(basic_acquisition_config, ten_day_video_query_config):
+    with patch.object(main.TikTokApiClient, "from_config") as from_config:
+        client = from_config.return_value
+        client.fetch_and_store_all.side_effect = api_client.ApiRejectedCredentialsError("rejected")
+        with pytest.raises(api_client.ApiRejectedCredentialsError):
+            main.main_driver(
+                basic_acquisition_config, ten_day_video_query_config, max_days_per_query=1
+            )
+
+    client.fetch_and_store_all.assert_called_once()
+    client.close.assert_called_once()
+
+
+@pytest.mark.parametrize(
+    ("store_results_in_background", "use_file_database", "expected"),
+    [
+        (False, True, False),
+        (True, True, True),
+        # In-memory databases cannot be written to from other threads
+        (True, False, False),
+    ],
+)
+def test_main_driver_store_results_in_background(
+    file_database_engine,
+    test_database_engine,
+    basic_acquisition_config,
+    ten_day_video_query_config,
+    store_results_in_background,
+    use_file_database,
+    expected,
+):
+    basic_acquisition_config.engine = (
+        file_database_engine if use_file_database else test_database_engine
+    )
+    with patch.object(main.TikTokApiClient, "from_config") as from_config:
+        main.main_driver(
+            basic_acquisition_config,
+            ten_day_video_query_config,
+            # Single window
+            max_days_per_query=30,
+            store_results_in_background=store_results_in_background,
+        )
+
+    from_config.return_value.fetch_and_store_all.assert_called_once_with(
+        ten_day_video_query_config, store_results_in_background=expected
+    )
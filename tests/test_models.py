@@ -1,9 +1,13 @@
+import copy
 import datetime
 import itertools
 
 import pytest
 from sqlalchemy import (
+    delete,
+    event,
     select,
+    text,
 )
 from sqlalchemy.orm import Session
 
@@ -14,12 +18,20 @@ from tests.common import (
     all_videos,
 )
 from tiktok_research_api_helper.models import (
+    Comment,
     Crawl,
     CrawlTag,
     Effect,
     Hashtag,
     Video,
+    crawls_to_crawl_tags_association_table,
+    get_sqlite_engine_and_create_tables,
+    upsert_comments,
     upsert_videos,
+    videos_to_crawl_tags_association_table,
+    videos_to_crawls_association_table,
+    videos_to_effect_ids_association_table,
+    videos_to_hashtags_association_table,
 )
 
 
@@ -120,6 +132,15 @@ def _assert_video_database_object_matches_api_response_dict(video_object, api_re
             raise ValueError(error_msg) from e
 
 
+def test_sqlite_connect_pragmas_applied(tmp_path):
+    engine = get_sqlite_engine_and_create_tables(tmp_path / "test.db")
+    with engine.connect() as conn:
+        assert conn.execute(text("PRAGMA journal_mode")).scalar() == "wal"
+        # NORMAL
+        assert conn.execute(text("PRAGMA synchronous")).scalar() == 1
+        assert conn.execute(text("PRAGMA mmap_size")).scalar() == 268435456
+
+
 def test_video_basic_insert(test_database_engine, mock_videos):
     with Session(test_database_engine) as session:
         session.add_all(mock_videos)
@@ -207,6 +228,31 @@ def test_none_crawl_tags(test_database_engine, mock_crawl):
         } == set()
 
 
+def test_crawl_update_progress_in_db(test_database_engine, mock_crawl):
+    crawl_tag_names = {crawl_tag.name for crawl_tag in mock_crawl.crawl_tags}
+    # Crawl not yet in database is uploaded in full
+    mock_crawl.update_progress_in_db(test_database_engine)
+    assert mock_crawl.id is not None
+    initial_mock_crawl_id = mock_crawl.id
+
+    mock_crawl.cursor += 100
+    mock_crawl.has_more = False
+    mock_crawl.search_id = "new_search_id"
+    mock_crawl.extra_data = {"possibly_deleted": 3}
+    mock_crawl.update_progress_in_db(test_database_engine)
+    assert mock_crawl.id == initial_mock_crawl_id
+
+    with Session(test_database_engine) as session:
+        crawls = all_crawls(session)
+        assert len(crawls) == 1
+        crawl = crawls[0]
+        assert crawl.cursor == mock_crawl.cursor
+        assert not crawl.has_more
+        assert crawl.search_id == "new_search_id"
+        assert crawl.extra_data == {"possibly_deleted": 3}
+        assert {crawl_tag.name for crawl_tag in crawl.crawl_tags} == crawl_tag_names
+
+
 def test_upsert(test_database_engine, mock_videos, mock_crawl):
     with Session(test_database_engine) as session:
         session.add_all(mock_videos)
@@ -663,6 +709,83 @@ def test_upsert_api_response_videos(test_database_engine, mock_crawl, api_respon
         )
 
 
+def test_video_tag_relationships_loaded_without_per_video_selects(
+    test_database_engine, mock_crawl, api_response_videos
+):
+    upsert_videos(
+        api_response_videos,
+        crawl_id=mock_crawl.id,
+        engine=test_database_engine,
+        crawl_tags=["testing"],
+    )
+    statements = []
+
+    def record_statement(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+
+    event.listen(test_database_engine, "before_cursor_execute", record_statement)
+    try:
+        with Session(test_database_engine) as session:
+            videos = session.scalars(select(Video)).all()
+            num_statements_after_load = len(statements)
+            for video in videos:
+                assert video.hashtag_names is not None
+                assert video.effect_ids is not None
+                assert video.crawl_tag_names == {"testing"}
+    finally:
+        event.remove(test_database_engine, "before_cursor_execute", record_statement)
+
+    assert len(videos) > 1
+    # One SELECT for videos, plus one for each of hashtags, effects, and crawl tags
+    assert num_statements_after_load == 4
+    assert len(statements) == num_statements_after_load
+
+
+def test_video_repr_does_not_lazy_load_crawls(test_database_engine, mock_videos, mock_crawl):
+    video_id = mock_videos[0].id
+    with Session(test_database_engine) as session:
+        session.add_all(mock_videos)
+        session.commit()
+
+    statements = []
+
+    def record_statement(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+
+    with Session(test_database_engine) as session:
+        video = session.get(Video, video_id)
+        event.listen(test_database_engine, "before_cursor_execute", record_statement)
+        try:
+            video_repr = repr(video)
+        finally:
+            event.remove(test_database_engine, "before_cursor_execute", record_statement)
+
+    assert statements == []
+    assert "crawls=<not loaded>" in video_repr
+    assert "hashtag1" in video_repr
+
+
+def test_upsert_videos_does_not_modify_video_data(
+    test_database_engine, mock_crawl, api_response_videos
+):
+    original_api_response_videos = copy.deepcopy(api_response_videos)
+    upsert_videos(api_response_videos, crawl_id=mock_crawl.id, engine=test_database_engine)
+    assert api_response_videos == original_api_response_videos
+
+
+def test_upsert_comments_does_not_modify_comments(
+    test_database_engine, testdata_api_comments_response_json
+):
+    comments = testdata_api_comments_response_json["data"]["comments"]
+    original_comments = copy.deepcopy(comments)
+    upsert_comments(comments, engine=test_database_engine)
+    assert comments == original_comments
+    with Session(test_database_engine) as session:
+        assert {comment.id for comment in session.scalars(select(Comment))} == {
+            comment["id"] for comment in comments
+        }
+
+
 def test_remove_all(test_database_engine, mock_videos, mock_crawl):
     with Session(test_database_engine) as session:
         session.add_all(mock_crawl.crawl_tags)
@@ -672,12 +795,40 @@ def test_remove_all(test_database_engine, mock_videos, mock_crawl):
         assert all_videos(session) == mock_videos
         assert all_crawls(session) == [mock_crawl]
 
-        for video in session.scalars(select(Video)):
+        for video in session.scalars(select(Video).execution_options(yield_per=1000)):
             session.delete(video)
 
-        for crawl in session.scalars(select(Crawl)):
+        for crawl in session.scalars(select(Crawl).execution_options(yield_per=1000)):
             session.delete(crawl)
 
         session.commit()
         assert all_videos(session) == []
         assert all_crawls(session) == []
+        assert session.scalars(select(videos_to_hashtags_association_table)).all() == []
+
+
+def test_remove_all_bulk_delete(test_database_engine, mock_videos, mock_crawl):
+    with Session(test_database_engine) as session:
+        session.add_all(mock_crawl.crawl_tags)
+        session.add_all([mock_crawl])
+        session.add_all(mock_videos)
+        session.commit()
+        assert all_videos(session) == mock_videos
+        assert all_crawls(session) == [mock_crawl]
+
+        # Association rows first, since bulk DELETE does not cascade through relationships.
+        for table in (
+            videos_to_hashtags_association_table,
+            videos_to_effect_ids_association_table,
+            videos_to_crawl_tags_association_table,
+            videos_to_crawls_association_table,
+            crawls_to_crawl_tags_association_table,
+        ):
+            session.execute(delete(table))
+        session.execute(delete(Video))
+        session.execute(delete(Crawl))
+
+        session.commit()
+        assert all_videos(session) == []
+        assert all_crawls(session) == []
+        assert session.scalars(select(videos_to_hashtags_association_table)).all() == []
@@ -1,5 +1,6 @@
 import json
 
+import attrs
 import pytest
 
 from tiktok_research_api_helper.query import (
@@ -180,6 +181,33 @@ def test_invalid_region_code():
         )
 
 
+def test_condition_accepts_plain_string_values():
+    assert Cond(Fields.video_length, "SHORT", "EQ").as_dict() == {
+        "operation": "EQ",
+        "field_name": "video_length",
+        "field_values": ["SHORT"],
+    }
+
+
+@pytest.mark.parametrize(
+    ("field", "field_value", "operation"),
+    [
+        (Fields.video_length, "invalid", Op.EQ),
+        (Fields.region_code, "US", "invalid"),
+    ],
+)
+def test_condition_invalid_value_or_operation(field, field_value, operation):
+    with pytest.raises(ValueError):
+        Cond(field, field_value, operation)
+
+
+def test_condition_and_query_are_immutable(mock_query_us):
+    with pytest.raises(attrs.exceptions.FrozenInstanceError):
+        mock_query_us.and_[0].operation = Op.IN
+    with pytest.raises(attrs.exceptions.FrozenInstanceError):
+        mock_query_us.not_ = mock_query_us.and_
+
+
 def test_query_json_decoder_us(mock_query_us):
     assert json.dumps(mock_query_us, cls=VideoQueryJSONEncoder, indent=1) == (
         """
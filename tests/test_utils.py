@@ -1,3 +1,4 @@
+import re
 from datetime import datetime, timedelta
 
 import pytest
@@ -34,3 +35,70 @@ def test_crawl_date_window_is_behind_today(crawl_lag, days_behind_today, expecte
         )
         == expected
     )
+
+
+@pytest.mark.parametrize(
+    ("start_date", "end_date", "max_days", "expected"),
+    [
+        # Same start and end date is a single window
+        (
+            datetime(2024, 6, 1),
+            datetime(2024, 6, 1),
+            7,
+            [(datetime(2024, 6, 1), datetime(2024, 6, 1))],
+        ),
+        # Last window end date is clamped to end_date
+        (
+            datetime(2024, 6, 1),
+            datetime(2024, 6, 8),
+            3,
+            [
+                (datetime(2024, 6, 1), datetime(2024, 6, 4)),
+                (datetime(2024, 6, 4), datetime(2024, 6, 7)),
+                (datetime(2024, 6, 7), datetime(2024, 6, 8)),
+            ],
+        ),
+        # Span that is a multiple of max_days ends with a window starting on end_date
+        (
+            datetime(2024, 6, 1),
+            datetime(2024, 6, 8),
+            7,
+            [
+                (datetime(2024, 6, 1), datetime(2024, 6, 8)),
+                (datetime(2024, 6, 8), datetime(2024, 6, 8)),
+            ],
+        ),
+        # End date before start date produces no windows
+        (datetime(2024, 6, 8), datetime(2024, 6, 1), 7, []),
+    ],
+)
+def test_make_query_date_windows(start_date, end_date, max_days, expected):
+    assert (
+        utils.make_query_date_windows(start_date, end_date, utils.int_to_days(max_days)) == expected
+    )
+
+
+@pytest.mark.parametrize(
+    ("date_str", "expected"),
+    [
+        ("20240601", datetime(2024, 6, 1)),
+        ("20241231", datetime(2024, 12, 31)),
+        ("20240229", datetime(2024, 2, 29)),
+    ],
+)
+def test_str_tiktok_date_format_to_datetime(date_str, expected):
+    assert utils.str_tiktok_date_format_to_datetime(date_str) == expected
+
+
+@pytest.mark.parametrize("date_str", ["20241301", "20230229", "2024-06-01", "", "２０２４０６０１"])
+def test_str_tiktok_date_format_to_datetime_invalid_raises_value_error(date_str):
+    with pytest.raises(ValueError):
+        utils.str_tiktok_date_format_to_datetime(date_str)
+
+
+@pytest.mark.parametrize("date_str", ["20241301", "20230229", "2024-06-01"])
+def test_str_tiktok_date_format_to_datetime_invalid_error_matches_strptime(date_str):
+    with pytest.raises(ValueError) as strptime_error:
+        datetime.strptime(date_str, utils.TIKTOK_DATE_FORMAT)
+    with pytest.raises(ValueError, match=re.escape(str(strptime_error.value))):
+        utils.str_tiktok_date_format_to_datetime(date_str)